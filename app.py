@@ -1,12 +1,18 @@
 import streamlit as st
 import pandas as pd
-from domain_checker import check_domains
+from domain_checker import CancelToken, UNCHECKED_STATUS
 from city_finder import find_cities_in_radius, get_city_coordinates
-from hardcoded_cities import find_nearby_cities
+from city_resolver import find_nearby_cities, resolve_city, city_name, matching_states
+from domain_history import record_results, format_change_event, set_watched
+from check_queue import CheckScheduler, PRIORITY_INTERACTIVE, configured_workers
+from rdap_verifier import RdapVerifier
+from results import ResultSet, DomainStatus
+from search_profiler import SearchProfiler
 import json
 from datetime import datetime
 import os
 import time
+import threading
 import re
 from functools import wraps
 import secrets
@@ -17,7 +23,9 @@ MAX_REQUESTS_PER_MINUTE = 30
 MAX_CITIES_PER_SEARCH = 50
 ALLOWED_TLDS = ["com", "net", "org", "io", "co"]
 MAX_BUSINESS_TYPE_LENGTH = 30
+DEFAULT_SEARCH_TIME_LIMIT = 120
 SAVED_SEARCHES_DIR = "saved_searches"
+PROFILES_DIR = os.path.join(SAVED_SEARCHES_DIR, "profiles")
 
 # Initialize session state variables if they don't exist
 if 'cities_list' not in st.session_state:
@@ -78,6 +86,76 @@ def validate_city(city):
         return False, "City name contains invalid characters"
     return True, ""
 
+@st.cache_resource
+def get_check_scheduler():
+    """Shared scheduler so checks from all sessions are prioritised together"""
+    return CheckScheduler(workers=configured_workers())
+
+@st.cache_resource
+def get_rdap_verifier():
+    """Shared RDAP verifier so the connection pool and cache outlive reruns"""
+    return RdapVerifier()
+
+def run_checks(domains, delay, timeout, verify_rdap=False, time_limit=DEFAULT_SEARCH_TIME_LIMIT, profiler=None):
+    """Check domains through the shared scheduler as an interactive request"""
+    cancel_token = CancelToken(deadline=time_limit)
+    scheduler = get_check_scheduler()
+    job = scheduler.submit(
+        domains,
+        st.session_state.session_id,
+        priority=PRIORITY_INTERACTIVE,
+        delay=delay,
+        timeout=timeout,
+        cancel_token=cancel_token
+    )
+    if profiler is not None:
+        profiler.watch(scheduler, job)
+    status_text = st.empty()
+    try:
+        # Poll so Streamlit can stop this script when the user navigates away
+        while job.wait(0.2) is None:
+            status_text.text(f"Checked {job.completed}/{len(domains)} domains...")
+    finally:
+        # Release scheduler capacity if the script was interrupted
+        if not job.done():
+            job.cancel()
+    status_text.empty()
+    results = job.results
+    if verify_rdap and not cancel_token.cancelled:
+        results = verify_with_rdap(results, cancel_token, status_text)
+        status_text.empty()
+    report_unchecked(results)
+    return results
+
+def verify_with_rdap(results, cancel_token, status_text):
+    """Confirm available domains with RDAP, stopping with the search's cancel token"""
+    verifier = get_rdap_verifier()
+    outcome = []
+    worker = threading.Thread(
+        target=lambda: outcome.append(verifier.verify_results(results, cancel_token)),
+        name="rdap-verify",
+        daemon=True
+    )
+    worker.start()
+    try:
+        # Poll so Streamlit can stop this script when the user navigates away
+        while worker.is_alive():
+            status_text.text("Confirming available domains with RDAP...")
+            worker.join(0.2)
+    finally:
+        # Stop the outstanding lookups if the script was interrupted
+        if worker.is_alive():
+            cancel_token.cancel()
+    if cancel_token.cancelled:
+        st.warning("Search time limit reached: some available domains were not confirmed with RDAP.")
+    return outcome[0] if outcome else results
+
+def report_unchecked(results):
+    """Warn when a search stopped before every domain was checked"""
+    unchecked = sum(1 for _, status in results if status == UNCHECKED_STATUS)
+    if unchecked:
+        st.warning(f"Search time limit reached: {unchecked} of {len(results)} domains were not checked.")
+
 def ensure_saved_searches_dir():
     if not os.path.exists(SAVED_SEARCHES_DIR):
         os.makedirs(SAVED_SEARCHES_DIR)
@@ -95,27 +173,62 @@ def load_saved_searches():
                 saved_searches.append(json.load(f))
     return saved_searches
 
-def save_search(results, business_type, selected_tld, cities):
-    """Save search results to a JSON file"""
+def save_search(results, business_type, selected_tld, cities, profiler=None):
+    """Save search results to a JSON file, with the profile artifact if one was recorded"""
     ensure_saved_searches_dir()
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{SAVED_SEARCHES_DIR}/search_{timestamp}.json"
+    # Session prefix keeps searches saved by different users in the same second apart
+    search_id = f"search_{timestamp}_{st.session_state.session_id[:8]}"
+    filename = f"{SAVED_SEARCHES_DIR}/{search_id}.json"
     
+    results = ResultSet.from_pairs(results)
     search_data = {
         'timestamp': timestamp,
         'business_type': business_type,
         'tld': selected_tld,
-        'results': results,
+        'results': results.to_json_dict(),
         'cities': cities
     }
+    if profiler is not None and profiler.enabled:
+        search_data['profile'] = profiler.save(f"{PROFILES_DIR}/{search_id}_profile.json")
     
-    with open(filename, 'w') as f:
+    # Write to a temporary file first so other sessions never load a partial file
+    with open(f"{filename}.tmp", 'w') as f:
         json.dump(search_data, f)
+    os.replace(f"{filename}.tmp", filename)
+    
+    # Track status history so changes since the last check can be reported
+    for event in record_results(results):
+        st.info(f"Status changed: {format_change_event(event)}")
     
     st.session_state.saved_searches = load_saved_searches()
 
+def display_profile(profiler):
+    """Show a profiled search's slowest domains and offer the profile for download"""
+    profile = profiler.to_dict()
+    with st.expander(f"Search profile ({profile['wall_time']:.1f}s)"):
+        if profile['slowest_domains']:
+            st.markdown("**Slowest domains**")
+            st.dataframe(pd.DataFrame(profile['slowest_domains']), use_container_width=True)
+        st.download_button(
+            label="Download Profile (JSON)",
+            data=json.dumps(profile),
+            file_name="search_profile.json",
+            mime="application/json",
+            key=f"profile_json_{profiler.started_at.isoformat()}"
+        )
+        st.download_button(
+            label="Download Flamegraph Stacks",
+            data=profile['folded_stacks'],
+            file_name="search_profile.folded",
+            mime="text/plain",
+            help="Folded stacks for flamegraph.pl or speedscope.app",
+            key=f"profile_folded_{profiler.started_at.isoformat()}"
+        )
+
 def display_results(results, key_prefix=None):
     """Display results with affiliate links for available domains"""
+    results = ResultSet.from_pairs(results)
     st.subheader("Results")
     # Table header
     cols = st.columns([3, 2, 2])
@@ -154,10 +267,9 @@ def display_results(results, key_prefix=None):
             cols[2].markdown("-")
 
     # Count availability stats
-    df = pd.DataFrame(results, columns=["Domain", "Status"])
-    available_count = df[df['Status'] == 'Available'].shape[0]
-    registered_active_count = df[df['Status'] == 'Registered (Active Website)'].shape[0]
-    registered_inactive_count = df[df['Status'] == 'Registered (No Active Website)'].shape[0]
+    available_count = results.count(DomainStatus.AVAILABLE)
+    registered_active_count = results.count(DomainStatus.REGISTERED_ACTIVE)
+    registered_inactive_count = results.count(DomainStatus.REGISTERED_INACTIVE)
 
     # Display stats
     st.subheader("Summary")
@@ -170,7 +282,7 @@ def display_results(results, key_prefix=None):
         st.metric("Registered (Inactive)", registered_inactive_count, f"{registered_inactive_count/len(results):.0%}")
 
     # Add download button for CSV with unique key
-    csv = df.to_csv(index=False)
+    csv = results.to_dataframe().to_csv(index=False)
     st.download_button(
         label="Download Results as CSV",
         data=csv,
@@ -180,7 +292,8 @@ def display_results(results, key_prefix=None):
     )
 
 @rate_limit
-def check_city_domains(cities_to_check, business_type, selected_tld, delay, timeout):
+def check_city_domains(cities_to_check, business_type, selected_tld, delay, timeout, verify_rdap=False,
+                       time_limit=DEFAULT_SEARCH_TIME_LIMIT, profile=False):
     """Perform domain checks with rate limiting and input validation"""
     # Validate inputs
     if not cities_to_check:
@@ -212,18 +325,32 @@ def check_city_domains(cities_to_check, business_type, selected_tld, delay, time
     progress_bar = st.progress(0)
     status_text = st.empty()
     
-    # Process domains in batches to update UI
-    results = []
-    for i, city in enumerate(cities_to_check):
-        # Update progress and status
-        progress = (i + 1) / len(cities_to_check)
-        progress_bar.progress(progress)
-        status_text.text(f"Checking domain for {city}... ({i+1}/{len(cities_to_check)})")
-        
-        # Check domain
-        domain = f"{city.lower().replace(' ', '')}{business_type_nospaces}.{selected_tld}"
-        status = check_domains([domain], delay, timeout)[0][1]
-        results.append([domain, status])
+    # Submit all domains to the scheduler and update the UI as they complete
+    domains = [f"{city.lower().replace(' ', '')}{business_type_nospaces}.{selected_tld}" for city in cities_to_check]
+    cancel_token = CancelToken(deadline=time_limit)
+    with SearchProfiler(enabled=profile) as profiler:
+        scheduler = get_check_scheduler()
+        job = scheduler.submit(
+            domains,
+            st.session_state.session_id,
+            priority=PRIORITY_INTERACTIVE,
+            delay=delay,
+            timeout=timeout,
+            cancel_token=cancel_token
+        )
+        profiler.watch(scheduler, job)
+        try:
+            while job.wait(0.2) is None:
+                progress_bar.progress(job.completed / len(domains))
+                status_text.text(f"Checking domains... ({job.completed}/{len(domains)})")
+        finally:
+            # Release scheduler capacity if the script was interrupted
+            if not job.done():
+                job.cancel()
+        results = job.results
+        if verify_rdap and not cancel_token.cancelled:
+            results = verify_with_rdap(results, cancel_token, status_text)
+    report_unchecked(results)
     
     # Final update
     progress_bar.progress(1.0)
@@ -231,10 +358,12 @@ def check_city_domains(cities_to_check, business_type, selected_tld, delay, time
     
     # Display results with affiliate links
     display_results(results)
+    if profiler.enabled:
+        display_profile(profiler)
     
     # Add save search button
     if st.button("Save This Search"):
-        save_search(results, business_type, selected_tld, cities_to_check)
+        save_search(results, business_type, selected_tld, cities_to_check, profiler)
         st.success("Search saved successfully!")
 
 st.set_page_config(
@@ -321,6 +450,8 @@ with st.expander("How to use this tool"):
     - **Available:** You can buy this website name.
     - **Registered (Active Website):** Someone else owns this name and has a website.
     - **Registered (No Active Website):** Someone owns this name, but there is no website.
+    - **Unchecked:** The search hit its time limit before this name was checked.
+    - **Registered (No DNS):** Someone owns this name, but it is not set up yet (shown when RDAP confirmation is on).
 
     **Example cities:**
     ```
@@ -338,7 +469,7 @@ with st.expander("Advanced Settings"):
     delay = st.slider(
         "Delay between requests (seconds)",
         0.1, 2.0, 0.5, 0.1,
-        help="Higher values reduce the risk of being blocked"
+        help="Minimum time between starting checks in one search. Higher values reduce the risk of being blocked."
     )
     timeout = st.slider(
         "Request timeout (seconds)",
@@ -346,6 +477,24 @@ with st.expander("Advanced Settings"):
         help="Time to wait for a domain to respond"
     )
 
+    search_time_limit = st.slider(
+        "Search time limit (seconds)",
+        10, 600, DEFAULT_SEARCH_TIME_LIMIT, 10,
+        help="Domains not checked within this time are marked as Unchecked"
+    )
+
+    verify_rdap = st.checkbox(
+        "Confirm available domains with RDAP",
+        value=False,
+        help="Double-check domains that look available with the registry, which catches registered names without DNS"
+    )
+
+    profile_searches = st.checkbox(
+        "Profile searches",
+        value=False,
+        help="Record where search time goes and save it as a downloadable profile with the search"
+    )
+
     # Domain TLD options
     selected_tld = st.selectbox(
         "Domain Extension (TLD)",
@@ -385,15 +534,18 @@ with tab1:
             with st.spinner("Checking domain availability..."):
                 # Format domains before checking
                 domains_to_check = [f"{city.lower().replace(' ', '')}{business_type_nospaces}.{selected_tld}" for city in cities]
-                results = check_domains(domains_to_check, delay, timeout)
-                display_results(results)
-                save_search(results, business_type, selected_tld, cities)
+                with SearchProfiler(enabled=profile_searches) as profiler:
+                    results = run_checks(domains_to_check, delay, timeout, verify_rdap, search_time_limit, profiler)
+                    display_results(results)
+                save_search(results, business_type, selected_tld, cities, profiler)
+                if profiler.enabled:
+                    display_profile(profiler)
 
 with tab2:
     # Input for finding nearby cities
     col1, col2 = st.columns(2)
     with col1:
-        city = st.text_input("Enter a city name")
+        city = st.text_input("Enter a city name", help="Add a state to disambiguate, e.g. Portland, ME")
     with col2:
         radius = st.number_input("Radius (miles)", min_value=1, max_value=100, value=25)
 
@@ -402,9 +554,19 @@ with tab2:
             st.error("Please enter a city name")
         else:
             with st.spinner("Finding nearby cities..."):
+                states = matching_states(city)
+                if len(states) > 1:
+                    st.info(
+                        f"\"{city}\" matches cities in {', '.join(states)}; showing {states[0]}. "
+                        f"Add a state (e.g. \"{city}, {states[1]}\") to search another one."
+                    )
                 nearby_cities = find_nearby_cities(city, radius)
                 if nearby_cities:
-                    st.success(f"Found {len(nearby_cities)} cities within {radius} miles of {city}")
+                    farthest = max(distance for _, distance in nearby_cities)
+                    if farthest > radius:
+                        st.success(f"Found {len(nearby_cities)} cities near {city} (up to {farthest} miles away)")
+                    else:
+                        st.success(f"Found {len(nearby_cities)} cities within {radius} miles of {city}")
                     df = pd.DataFrame(nearby_cities, columns=['City', 'Distance (miles)'])
                     df = df.sort_values('Distance (miles)')
                     st.session_state.nearby_cities_df = df
@@ -417,15 +579,20 @@ with tab2:
         st.dataframe(st.session_state.nearby_cities_df, use_container_width=True)
         if st.button("Check Domains for These Cities"):
             cities = st.session_state.nearby_cities_df['City'].tolist()
-            # Ensure the main city is included
-            if city and city.strip() and city.strip() not in cities:
-                cities = [city.strip()] + cities
+            # Ensure the main city is included, by its name without any state
+            entry = resolve_city(city) if city else None
+            main_city = city_name(entry) if entry else ""
+            if main_city and main_city not in cities:
+                cities = [main_city] + cities
             business_type_nospaces = business_type.replace(' ', '').lower()
             with st.spinner("Checking domain availability..."):
                 domains_to_check = [f"{c.lower().replace(' ', '')}{business_type_nospaces}.{selected_tld}" for c in cities]
-                results = check_domains(domains_to_check, delay, timeout)
-                display_results(results)
-                save_search(results, business_type, selected_tld, cities)
+                with SearchProfiler(enabled=profile_searches) as profiler:
+                    results = run_checks(domains_to_check, delay, timeout, verify_rdap, search_time_limit, profiler)
+                    display_results(results)
+                save_search(results, business_type, selected_tld, cities, profiler)
+                if profiler.enabled:
+                    display_profile(profiler)
 
 with tab3:
     # Display saved searches
@@ -434,9 +601,25 @@ with tab3:
     if st.session_state.saved_searches:
         for i, search in enumerate(st.session_state.saved_searches):
             with st.expander(f"Search {i+1}: {search['business_type']} in {', '.join(search['cities'])}"):
-                display_results(search['results'], key_prefix=i)
+                display_results(ResultSet.from_json_dict(search['results']), key_prefix=i)
                 # Add download button for each search
                 if st.button(f"Download Results {i+1}"):
                     download_results(search['results'])
+                saved_domains = ResultSet.from_json_dict(search['results']).domains
+                if st.button(f"Watch Domains {i+1}", help="Re-check these domains on the hourly schedule"):
+                    set_watched(saved_domains)
+                    st.success("These domains will be re-checked on schedule.")
+                if st.button(f"Stop Watching {i+1}"):
+                    set_watched(saved_domains, watched=False)
+                    st.success("These domains will no longer be re-checked.")
+                if search.get('profile') and os.path.exists(search['profile']):
+                    with open(search['profile'], 'r') as f:
+                        st.download_button(
+                            label="Download Profile (JSON)",
+                            data=f.read(),
+                            file_name=os.path.basename(search['profile']),
+                            mime="application/json",
+                            key=f"saved_profile_{i}"
+                        )
     else:
         st.info("No saved searches yet. Perform a search to save results.") 
\ No newline at end of file
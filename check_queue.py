@@ -0,0 +1,273 @@
+"""
+Priority scheduling queue in front of the domain checker.
+
+Jobs are split into one task per domain so that interactive searches can jump
+ahead of a long bulk job between domains instead of waiting for it to finish.
+Tasks are picked by:
+
+1. Priority class (interactive before bulk). Some workers are reserved for
+   interactive work so a bulk job can never occupy every worker.
+2. Deadlines: a task whose deadline is within URGENT_WINDOW seconds is run
+   first, earliest deadline first.
+3. Fair sharing: otherwise the user with the fewest tasks served in that
+   class goes next, so one user's big job cannot starve another's.
+
+Each job is paced by its delay: its next task is not handed out until delay
+seconds after the previous one started, so workers never sleep while holding
+a slot and the delay throttles requests however many workers there are.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from domain_checker import check_domains, configure_resolver_pool, CancelToken, UNCHECKED_STATUS, ERROR_STATUS
+from results import ResultSet
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+PRIORITY_CLASSES = (PRIORITY_INTERACTIVE, PRIORITY_BULK)
+
+# One scheduler serves every session of a server process, so this is the
+# server-wide limit on concurrent checks. Override with CHECK_WORKERS=<n>.
+CHECK_WORKERS_ENV = "CHECK_WORKERS"
+DEFAULT_WORKERS = 32
+DEFAULT_RESERVED_INTERACTIVE_WORKERS = 2
+URGENT_WINDOW = 5.0
+
+
+def configured_workers(default=DEFAULT_WORKERS):
+    """Return the worker count from CHECK_WORKERS_ENV, or default if unset or invalid"""
+    value = os.environ.get(CHECK_WORKERS_ENV)
+    if not value:
+        return default
+    try:
+        workers = int(value)
+    except ValueError:
+        workers = 0
+    if workers < 1:
+        print(f"Ignoring invalid {CHECK_WORKERS_ENV}={value!r}, using {default} workers")
+        return default
+    return workers
+
+
+class CheckJob:
+    """A submitted list of domains whose results fill in as tasks finish"""
+
+    def __init__(self, domains, user_id, priority, deadline, delay, timeout, cancel_token):
+        # Domains read as unchecked until their task finishes
+        self.results = ResultSet.unchecked(domains)
+        self.domains = self.results.domains
+        self.user_id = user_id
+        self.priority = priority
+        self.deadline = deadline
+        self.delay = delay
+        self.timeout = timeout
+        self.cancel_token = cancel_token
+        self.submitted_at = time.monotonic()
+        # Monotonic time before which the job's next task is held back (pacing)
+        self.next_start_at = self.submitted_at
+        # One (index, ready_at, started_at, finished_at, thread_name) entry per
+        # finished domain; ready_at is when pacing first allowed the task to start
+        # and started_at..finished_at covers only the checker call
+        self.task_timings = []
+        self._remaining = len(self.domains)
+        self._done = threading.Event()
+        if not self.domains:
+            self._done.set()
+
+    def _set_result(self, index, status):
+        self.results.set_status(index, status)
+        self._remaining -= 1
+        if self._remaining == 0:
+            self._done.set()
+
+    @property
+    def completed(self):
+        """Number of domains checked so far"""
+        return len(self.domains) - self._remaining
+
+    def cancel(self):
+        """Stop the job; domains not yet checked are reported as unchecked"""
+        self.cancel_token.cancel()
+
+    def done(self):
+        """Return True once every domain in the job has been checked"""
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Block until the job finishes.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait
+
+        Returns:
+            ResultSet: The job's results, or None on timeout
+        """
+        if not self._done.wait(timeout):
+            return None
+        return self.results
+
+
+class CheckScheduler:
+    """Worker pool that runs domain checks in priority, deadline and fair-share order"""
+
+    def __init__(self, workers=DEFAULT_WORKERS,
+                 reserved_interactive_workers=DEFAULT_RESERVED_INTERACTIVE_WORKERS,
+                 checker=check_domains):
+        self._checker = checker
+        self._lock = threading.Condition()
+        self._seq = itertools.count()
+        # priority -> user_id -> heap of (deadline, seq, job, index)
+        self._queues = {priority: {} for priority in PRIORITY_CLASSES}
+        # priority -> user_id -> number of tasks handed out
+        self._served = {priority: {} for priority in PRIORITY_CLASSES}
+        # Worker thread ident -> job it is currently checking
+        self._running = {}
+        self._closed = False
+        self._threads = []
+        configure_resolver_pool(workers)
+        # Leave at least one worker for bulk jobs
+        reserved = min(reserved_interactive_workers, max(workers - 1, 0))
+        for i in range(workers):
+            allowed = (PRIORITY_INTERACTIVE,) if i < reserved else PRIORITY_CLASSES
+            thread = threading.Thread(
+                target=self._worker, args=(allowed,), name=f"check-worker-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, domains, user_id, priority=PRIORITY_INTERACTIVE, deadline=None,
+               delay=0.5, timeout=3, cancel_token=None):
+        """
+        Queue a list of domains for checking.
+
+        Args:
+            domains (list): List of domain names to check
+            user_id (str): Identifies the submitter for fair sharing
+            priority (int): PRIORITY_INTERACTIVE or PRIORITY_BULK
+            deadline (float, optional): Seconds from now by which results are wanted
+            delay (float): Minimum seconds between starting this job's checks
+            timeout (int): Request timeout in seconds
+            cancel_token (CancelToken, optional): Cancels the job; its deadline is
+                also used for ordering when no deadline is given
+
+        Returns:
+            CheckJob: Handle to wait on for results
+        """
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+        cancel_token = cancel_token or CancelToken()
+        if deadline is not None:
+            absolute_deadline = time.monotonic() + deadline
+        elif cancel_token.expires_at is not None:
+            absolute_deadline = cancel_token.expires_at
+        else:
+            absolute_deadline = float("inf")
+        job = CheckJob(domains, user_id, priority, absolute_deadline, delay, timeout, cancel_token)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Scheduler has been shut down")
+            queues = self._queues[priority]
+            served = self._served[priority]
+            if user_id not in queues:
+                # A newly active user starts level with the least-served active
+                # user, so earlier usage neither starves nor boosts them
+                served[user_id] = min((served[u] for u in queues), default=0)
+            user_queue = queues.setdefault(user_id, [])
+            for index in range(len(job.domains)):
+                heapq.heappush(user_queue, (absolute_deadline, next(self._seq), job, index))
+            self._lock.notify_all()
+        return job
+
+    def pending(self, priority=None):
+        """Return the number of queued (not yet started) tasks"""
+        with self._lock:
+            classes = PRIORITY_CLASSES if priority is None else (priority,)
+            return sum(len(q) for p in classes for q in self._queues[p].values())
+
+    def threads_for(self, job):
+        """Return the idents of worker threads currently checking a domain of this job"""
+        with self._lock:
+            return [ident for ident, running_job in self._running.items() if running_job is job]
+
+    def shutdown(self):
+        """Stop the workers once the queued tasks are drained"""
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def _next_task(self, allowed):
+        """Return (task or None, seconds until a held-back task becomes ready or None)"""
+        now = time.monotonic()
+        wake_in = None
+        for priority in allowed:
+            queues = self._queues[priority]
+            heads = []
+            for user_id, user_queue in queues.items():
+                job = user_queue[0][2]
+                # Cancelled jobs drain immediately; their tasks do no network work
+                if job.next_start_at > now and not job.cancel_token.cancelled:
+                    ready_in = job.next_start_at - now
+                    wake_in = ready_in if wake_in is None else min(wake_in, ready_in)
+                    continue
+                heads.append((user_queue[0], user_id))
+            if not heads:
+                continue
+            urgent = [head for head in heads if head[0][0] - now <= URGENT_WINDOW]
+            if urgent:
+                _, user_id = min(urgent, key=lambda head: head[0][:2])
+            else:
+                served = self._served[priority]
+                _, user_id = min(heads, key=lambda head: (served[head[1]], head[0][:2]))
+            user_queue = queues[user_id]
+            _, _, job, index = heapq.heappop(user_queue)
+            # Cancelled jobs skip pacing, so their tasks may be early
+            ready_at = min(job.next_start_at, now)
+            if user_queue:
+                self._served[priority][user_id] += 1
+            else:
+                del queues[user_id]
+                del self._served[priority][user_id]
+            job.next_start_at = now + job.delay
+            return (job, index, ready_at), None
+        return None, wake_in
+
+    def _worker(self, allowed):
+        while True:
+            with self._lock:
+                task, wake_in = self._next_task(allowed)
+                while task is None:
+                    if self._closed and not any(self._queues[p] for p in allowed):
+                        return
+                    self._lock.wait(wake_in)
+                    task, wake_in = self._next_task(allowed)
+            job, index, ready_at = task
+            ident = threading.get_ident()
+            with self._lock:
+                self._running[ident] = job
+            started_at = time.monotonic()
+            if job.cancel_token.cancelled:
+                # Drop tasks of cancelled jobs without using up a check
+                status = UNCHECKED_STATUS
+            else:
+                try:
+                    # The scheduler paces the job, so the checker must not sleep
+                    status = self._checker(
+                        [job.domains[index]], 0, job.timeout, cancel_token=job.cancel_token
+                    )[0][1]
+                except Exception as e:
+                    print(f"Error checking {job.domains[index]}: {e}")
+                    status = ERROR_STATUS
+            finished_at = time.monotonic()
+            with self._lock:
+                del self._running[ident]
+                job.task_timings.append(
+                    (index, ready_at, started_at, finished_at, threading.current_thread().name)
+                )
+                job._set_result(index, status)
@@ -2,17 +2,21 @@ from geopy.geocoders import Nominatim
 from geopy.distance import geodesic
 import time
 
-def get_city_coordinates(city_name, state=None):
+def get_city_coordinates(city_name, state=None, cancel_token=None):
     """
     Get the latitude and longitude of a city
     
     Args:
         city_name (str): Name of the city
         state (str, optional): US state abbreviation to narrow search
+        cancel_token (CancelToken, optional): Skips the lookup once cancelled
+            and caps the request timeout at the remaining deadline
         
     Returns:
         tuple: (latitude, longitude) or None if not found
     """
+    if cancel_token is not None and cancel_token.cancelled:
+        return None
     try:
         geolocator = Nominatim(user_agent="domain_checker_app")
         
@@ -23,7 +27,8 @@ def get_city_coordinates(city_name, state=None):
             query = f"{city_name}, USA"
             
         # Get location (synchronous call)
-        location = geolocator.geocode(query, timeout=10)
+        geocode_timeout = cancel_token.limit(10) if cancel_token is not None else 10
+        location = geolocator.geocode(query, timeout=geocode_timeout)
         
         if location:
             return (location.latitude, location.longitude)
@@ -33,7 +38,7 @@ def get_city_coordinates(city_name, state=None):
         return None
 
 
-def find_cities_in_radius(center_city, radius_miles, state=None, max_results=30):
+def find_cities_in_radius(center_city, radius_miles, state=None, max_results=30, cancel_token=None):
     """
     Find cities within a certain radius of a center city.
     Uses a preset list of cities by state for faster and more reliable results.
@@ -43,6 +48,8 @@ def find_cities_in_radius(center_city, radius_miles, state=None, max_results=30)
         radius_miles (float): Radius in miles
         state (str, optional): US state abbreviation to narrow search
         max_results (int): Maximum number of cities to return
+        cancel_token (CancelToken, optional): Stops geocoding early when cancelled;
+            cities found so far are still returned
         
     Returns:
         list: List of (city_name, distance) tuples within the radius
@@ -51,7 +58,7 @@ def find_cities_in_radius(center_city, radius_miles, state=None, max_results=30)
     print(f"Finding cities within {radius_miles} miles of {center_city}, state: {state}")
     
     # Get coordinates of the center city
-    center_coords = get_city_coordinates(center_city, state)
+    center_coords = get_city_coordinates(center_city, state, cancel_token)
     if not center_coords:
         print(f"Could not get coordinates for {center_city}")
         return []
@@ -155,12 +162,15 @@ def find_cities_in_radius(center_city, radius_miles, state=None, max_results=30)
     
     # Then check remaining cities (slower)
     for city in all_cities:
+        if cancel_token is not None and cancel_token.cancelled:
+            print("Search cancelled, returning cities found so far")
+            break
         if city.lower() in processed_cities:
             continue  # Skip cities we've already processed
             
         # Get coordinates for this city
         print(f"Checking distance to {city}")
-        coords = get_city_coordinates(city, state)
+        coords = get_city_coordinates(city, state, cancel_token)
         
         if coords:
             # Calculate distance
@@ -172,7 +182,10 @@ def find_cities_in_radius(center_city, radius_miles, state=None, max_results=30)
                 print(f"Added {city} at distance: {distance} miles")
         
         # Sleep to avoid rate limiting (shorter sleep since we have the known pairs approach)
-        time.sleep(0.5)
+        if cancel_token is not None:
+            cancel_token.wait(0.5)
+        else:
+            time.sleep(0.5)
     
     print(f"Found {len(cities_in_radius)} cities within radius")
     
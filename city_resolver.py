@@ -0,0 +1,597 @@
+"""
+Offline resolution layer for the "Find Cities by Radius" search.
+
+City names are normalized and looked up in an index built once at import time
+from the NEARBY_CITIES hubs, their neighbor lists, a table of US city
+coordinates and the places gazetteer in us_places.tsv. A city that is not a
+hub is snapped to the hubs within reach (by stored coordinates, or by its
+known distance when it is a hub neighbor), and the neighbor lists of those
+hubs are merged; a city with no hub in reach falls back to the nearest hub.
+No geocoding calls are made.
+"""
+
+import bisect
+import csv
+import math
+import os
+import re
+
+from hardcoded_cities import NEARBY_CITIES
+
+# Same cap as the auto-expanding radius search
+MAX_RADIUS_MILES = 100
+RADIUS_STEP_MILES = 10
+MIN_RESULTS = 5
+
+# Shorter partial names ("a", "new") match too many cities to guess from
+MIN_PREFIX_LENGTH = 3
+
+# Order in which index entries sharing a name are tried: hubs and their listed
+# neighbors are the cities the radius data is built around
+ENTRY_KIND_RANK = {"hub": 0, "neighbor": 1, "city": 2}
+
+# Census Gazetteer places file (tab-separated, USPS/NAME/INTPTLAT/INTPTLONG
+# columns). The bundled file is a subset; the national places file from
+# https://www.census.gov/geographies/reference-files/time-series/geo/gazetteer-files.html
+# can replace it as is.
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "us_places.tsv")
+
+# Census place-type suffixes, e.g. "Bozeman city", "Hilo CDP"
+PLACE_TYPE_SUFFIX = re.compile(
+    r"\s+(city and borough|(metro|unified|consolidated) government \(balance\)|\(balance\)"
+    r"|city|town|township|village|borough|CDP|municipality)$"
+)
+
+# Display name, state and coordinates for each NEARBY_CITIES hub key
+HUB_LOCATIONS = {
+    "new york": ("New York", "NY", 40.7128, -74.0060),
+    "los angeles": ("Los Angeles", "CA", 34.0522, -118.2437),
+    "chicago": ("Chicago", "IL", 41.8781, -87.6298),
+    "houston": ("Houston", "TX", 29.7604, -95.3698),
+    "phoenix": ("Phoenix", "AZ", 33.4484, -112.0740),
+    "philadelphia": ("Philadelphia", "PA", 39.9526, -75.1652),
+    "san antonio": ("San Antonio", "TX", 29.4241, -98.4936),
+    "san diego": ("San Diego", "CA", 32.7157, -117.1611),
+    "dallas": ("Dallas", "TX", 32.7767, -96.7970),
+    "san jose": ("San Jose", "CA", 37.3382, -121.8863),
+    "austin": ("Austin", "TX", 30.2672, -97.7431),
+    "jacksonville": ("Jacksonville", "FL", 30.3322, -81.6557),
+    "fort worth": ("Fort Worth", "TX", 32.7555, -97.3308),
+    "indianapolis": ("Indianapolis", "IN", 39.7684, -86.1581),
+    "san francisco": ("San Francisco", "CA", 37.7749, -122.4194),
+    "columbus": ("Columbus", "OH", 39.9612, -82.9988),
+    "charlotte": ("Charlotte", "NC", 35.2271, -80.8431),
+    "detroit": ("Detroit", "MI", 42.3314, -83.0458),
+    "el paso": ("El Paso", "TX", 31.7619, -106.4850),
+    "memphis": ("Memphis", "TN", 35.1495, -90.0490),
+    "boston": ("Boston", "MA", 42.3601, -71.0589),
+    "seattle": ("Seattle", "WA", 47.6062, -122.3321),
+    "denver": ("Denver", "CO", 39.7392, -104.9903),
+    "washington": ("Washington", "DC", 38.9072, -77.0369),
+    "nashville": ("Nashville", "TN", 36.1627, -86.7816),
+    "baltimore": ("Baltimore", "MD", 39.2904, -76.6122),
+    "louisville": ("Louisville", "KY", 38.2527, -85.7585),
+    "portland": ("Portland", "OR", 45.5152, -122.6784),
+    "oklahoma": ("Oklahoma City", "OK", 35.4676, -97.5164),
+    "milwaukee": ("Milwaukee", "WI", 43.0389, -87.9065),
+    "las vegas": ("Las Vegas", "NV", 36.1699, -115.1398),
+    "albuquerque": ("Albuquerque", "NM", 35.0844, -106.6504),
+    "tucson": ("Tucson", "AZ", 32.2226, -110.9747),
+    "miami": ("Miami", "FL", 25.7617, -80.1918),
+}
+
+# Other names people type for hubs
+HUB_ALIASES = {
+    "new york city": "new york",
+    "nyc": "new york",
+    "oklahoma city": "oklahoma",
+    "okc": "oklahoma",
+    "washington dc": "washington",
+    "dc": "washington",
+    "la": "los angeles",
+    "sf": "san francisco",
+}
+
+# Non-hub US cities with coordinates, used to snap inputs to nearby hubs
+CITY_LOCATIONS = [
+    ("Atlanta", "GA", 33.7490, -84.3880),
+    ("Kansas City", "MO", 39.0997, -94.5786),
+    ("Kansas City", "KS", 39.1141, -94.6275),
+    ("Omaha", "NE", 41.2565, -95.9345),
+    ("Raleigh", "NC", 35.7796, -78.6382),
+    ("Minneapolis", "MN", 44.9778, -93.2650),
+    ("Saint Paul", "MN", 44.9537, -93.0900),
+    ("Tulsa", "OK", 36.1540, -95.9928),
+    ("Wichita", "KS", 37.6872, -97.3301),
+    ("New Orleans", "LA", 29.9511, -90.0715),
+    ("Cleveland", "OH", 41.4993, -81.6944),
+    ("Tampa", "FL", 27.9506, -82.4572),
+    ("Orlando", "FL", 28.5383, -81.3792),
+    ("Sacramento", "CA", 38.5816, -121.4944),
+    ("Fresno", "CA", 36.7378, -119.7871),
+    ("Long Beach", "CA", 33.7701, -118.1937),
+    ("Oakland", "CA", 37.8044, -122.2712),
+    ("Bakersfield", "CA", 35.3733, -119.0187),
+    ("Anaheim", "CA", 33.8366, -117.9143),
+    ("Riverside", "CA", 33.9806, -117.3755),
+    ("Stockton", "CA", 37.9577, -121.2908),
+    ("Colorado Springs", "CO", 38.8339, -104.8214),
+    ("Aurora", "CO", 39.7294, -104.8319),
+    ("Aurora", "IL", 41.7606, -88.3201),
+    ("Arlington", "TX", 32.7357, -97.1081),
+    ("Arlington", "VA", 38.8816, -77.0910),
+    ("Corpus Christi", "TX", 27.8006, -97.3964),
+    ("Lexington", "KY", 38.0406, -84.5037),
+    ("Henderson", "NV", 36.0395, -114.9817),
+    ("Pittsburgh", "PA", 40.4406, -79.9959),
+    ("Saint Louis", "MO", 38.6270, -90.1994),
+    ("Cincinnati", "OH", 39.1031, -84.5120),
+    ("Toledo", "OH", 41.6528, -83.5379),
+    ("Newark", "NJ", 40.7357, -74.1724),
+    ("Jersey City", "NJ", 40.7178, -74.0431),
+    ("Greensboro", "NC", 36.0726, -79.7920),
+    ("Durham", "NC", 35.9940, -78.8986),
+    ("Lincoln", "NE", 40.8136, -96.7026),
+    ("Anchorage", "AK", 61.2181, -149.9003),
+    ("Honolulu", "HI", 21.3069, -157.8583),
+    ("Buffalo", "NY", 42.8864, -78.8784),
+    ("Rochester", "NY", 43.1566, -77.6088),
+    ("Rochester", "MN", 44.0121, -92.4802),
+    ("Syracuse", "NY", 43.0481, -76.1474),
+    ("Albany", "NY", 42.6526, -73.7562),
+    ("Fort Wayne", "IN", 41.0793, -85.1394),
+    ("Saint Petersburg", "FL", 27.7676, -82.6403),
+    ("Chula Vista", "CA", 32.6401, -117.0842),
+    ("Irvine", "CA", 33.6846, -117.8265),
+    ("Laredo", "TX", 27.5306, -99.4803),
+    ("Lubbock", "TX", 33.5779, -101.8552),
+    ("Madison", "WI", 43.0731, -89.4012),
+    ("Chandler", "AZ", 33.3062, -111.8413),
+    ("Gilbert", "AZ", 33.3528, -111.7890),
+    ("Glendale", "AZ", 33.5387, -112.1860),
+    ("Scottsdale", "AZ", 33.4942, -111.9261),
+    ("Mesa", "AZ", 33.4152, -111.8315),
+    ("Flagstaff", "AZ", 35.1983, -111.6513),
+    ("Yuma", "AZ", 32.6927, -114.6277),
+    ("Reno", "NV", 39.5296, -119.8138),
+    ("Norfolk", "VA", 36.8508, -76.2859),
+    ("Virginia Beach", "VA", 36.8529, -75.9780),
+    ("Richmond", "VA", 37.5407, -77.4360),
+    ("Boise", "ID", 43.6150, -116.2023),
+    ("Spokane", "WA", 47.6588, -117.4260),
+    ("Tacoma", "WA", 47.2529, -122.4443),
+    ("Olympia", "WA", 47.0379, -122.9007),
+    ("Vancouver", "WA", 45.6387, -122.6615),
+    ("Des Moines", "IA", 41.5868, -93.6250),
+    ("Cedar Rapids", "IA", 41.9779, -91.6656),
+    ("Davenport", "IA", 41.5236, -90.5776),
+    ("Birmingham", "AL", 33.5186, -86.8104),
+    ("Montgomery", "AL", 32.3668, -86.3000),
+    ("Huntsville", "AL", 34.7304, -86.5861),
+    ("Mobile", "AL", 30.6954, -88.0399),
+    ("Little Rock", "AR", 34.7465, -92.2896),
+    ("Baton Rouge", "LA", 30.4515, -91.1871),
+    ("Shreveport", "LA", 32.5252, -93.7502),
+    ("Jackson", "MS", 32.2988, -90.1848),
+    ("Knoxville", "TN", 35.9606, -83.9207),
+    ("Chattanooga", "TN", 35.0456, -85.3097),
+    ("Salt Lake City", "UT", 40.7608, -111.8910),
+    ("Provo", "UT", 40.2338, -111.6585),
+    ("Grand Rapids", "MI", 42.9634, -85.6681),
+    ("Lansing", "MI", 42.7325, -84.5555),
+    ("Ann Arbor", "MI", 42.2808, -83.7430),
+    ("Akron", "OH", 41.0814, -81.5190),
+    ("Dayton", "OH", 39.7589, -84.1916),
+    ("Columbia", "SC", 34.0007, -81.0348),
+    ("Columbia", "MO", 38.9517, -92.3341),
+    ("Charleston", "SC", 32.7765, -79.9311),
+    ("Charleston", "WV", 38.3498, -81.6326),
+    ("Greenville", "SC", 34.8526, -82.3940),
+    ("Savannah", "GA", 32.0809, -81.0912),
+    ("Augusta", "GA", 33.4735, -82.0105),
+    ("Tallahassee", "FL", 30.4383, -84.2807),
+    ("Fort Lauderdale", "FL", 26.1224, -80.1373),
+    ("West Palm Beach", "FL", 26.7153, -80.0534),
+    ("Cape Coral", "FL", 26.5629, -81.9495),
+    ("Fort Myers", "FL", 26.6406, -81.8723),
+    ("Gainesville", "FL", 29.6516, -82.3248),
+    ("Pensacola", "FL", 30.4213, -87.2169),
+    ("Providence", "RI", 41.8240, -71.4128),
+    ("Hartford", "CT", 41.7658, -72.6734),
+    ("New Haven", "CT", 41.3083, -72.9279),
+    ("Bridgeport", "CT", 41.1865, -73.1952),
+    ("Worcester", "MA", 42.2626, -71.8023),
+    ("Springfield", "MA", 42.1015, -72.5898),
+    ("Springfield", "IL", 39.7817, -89.6501),
+    ("Springfield", "MO", 37.2090, -93.2923),
+    ("Manchester", "NH", 42.9956, -71.4548),
+    ("Portland", "ME", 43.6591, -70.2568),
+    ("Burlington", "VT", 44.4759, -73.2121),
+    ("Wilmington", "DE", 39.7391, -75.5398),
+    ("Dover", "DE", 39.1582, -75.5244),
+    ("Trenton", "NJ", 40.2206, -74.7597),
+    ("Harrisburg", "PA", 40.2732, -76.8867),
+    ("Allentown", "PA", 40.6084, -75.4902),
+    ("Erie", "PA", 42.1292, -80.0851),
+    ("Annapolis", "MD", 38.9784, -76.4922),
+    ("Topeka", "KS", 39.0473, -95.6752),
+    ("Sioux Falls", "SD", 43.5446, -96.7311),
+    ("Fargo", "ND", 46.8772, -96.7898),
+    ("Bismarck", "ND", 46.8083, -100.7837),
+    ("Billings", "MT", 45.7833, -108.5007),
+    ("Cheyenne", "WY", 41.1400, -104.8202),
+    ("Santa Fe", "NM", 35.6870, -105.9378),
+    ("Las Cruces", "NM", 32.3199, -106.7637),
+    ("Amarillo", "TX", 35.2220, -101.8313),
+    ("Midland", "TX", 31.9973, -102.0779),
+    ("Waco", "TX", 31.5493, -97.1467),
+    ("Plano", "TX", 33.0198, -96.6989),
+    ("Irving", "TX", 32.8140, -96.9489),
+    ("Garland", "TX", 32.9126, -96.6389),
+    ("Frisco", "TX", 33.1507, -96.8236),
+    ("McKinney", "TX", 33.1972, -96.6398),
+    ("Denton", "TX", 33.2148, -97.1331),
+    ("Killeen", "TX", 31.1171, -97.7278),
+    ("Round Rock", "TX", 30.5083, -97.6789),
+    ("College Station", "TX", 30.6280, -96.3344),
+    ("Beaumont", "TX", 30.0802, -94.1266),
+    ("Galveston", "TX", 29.3013, -94.7977),
+    ("Brownsville", "TX", 25.9017, -97.4975),
+    ("McAllen", "TX", 26.2034, -98.2300),
+    ("Salem", "OR", 44.9429, -123.0351),
+    ("Eugene", "OR", 44.0521, -123.0868),
+    ("Santa Barbara", "CA", 34.4208, -119.6982),
+    ("Santa Rosa", "CA", 38.4404, -122.7141),
+    ("Modesto", "CA", 37.6391, -120.9969),
+    ("San Bernardino", "CA", 34.1083, -117.2898),
+    ("Palm Springs", "CA", 33.8303, -116.5453),
+    ("Oxnard", "CA", 34.1975, -119.1771),
+    ("Fort Collins", "CO", 40.5853, -105.0844),
+    ("Boulder", "CO", 40.0150, -105.2705),
+    ("Pueblo", "CO", 38.2544, -104.6091),
+    ("Rockford", "IL", 42.2711, -89.0940),
+    ("Peoria", "IL", 40.6936, -89.5890),
+    ("Naperville", "IL", 41.7508, -88.1535),
+    ("Joliet", "IL", 41.5250, -88.0817),
+    ("Evansville", "IN", 37.9716, -87.5711),
+    ("South Bend", "IN", 41.6764, -86.2520),
+    ("Green Bay", "WI", 44.5133, -88.0133),
+    ("Duluth", "MN", 46.7867, -92.1005),
+]
+
+STATE_NAMES = {
+    "alabama": "AL", "alaska": "AK", "arizona": "AZ", "arkansas": "AR", "california": "CA",
+    "colorado": "CO", "connecticut": "CT", "delaware": "DE", "district of columbia": "DC",
+    "florida": "FL", "georgia": "GA", "hawaii": "HI", "idaho": "ID", "illinois": "IL",
+    "indiana": "IN", "iowa": "IA", "kansas": "KS", "kentucky": "KY", "louisiana": "LA",
+    "maine": "ME", "maryland": "MD", "massachusetts": "MA", "michigan": "MI", "minnesota": "MN",
+    "mississippi": "MS", "missouri": "MO", "montana": "MT", "nebraska": "NE", "nevada": "NV",
+    "new hampshire": "NH", "new jersey": "NJ", "new mexico": "NM", "new york": "NY",
+    "north carolina": "NC", "north dakota": "ND", "ohio": "OH", "oklahoma": "OK", "oregon": "OR",
+    "pennsylvania": "PA", "rhode island": "RI", "south carolina": "SC", "south dakota": "SD",
+    "tennessee": "TN", "texas": "TX", "utah": "UT", "vermont": "VT", "virginia": "VA",
+    "washington": "WA", "west virginia": "WV", "wisconsin": "WI", "wyoming": "WY",
+}
+STATE_CODES = set(STATE_NAMES.values())
+
+# Word-level abbreviations expanded during normalization
+ABBREVIATIONS = {"st": "saint", "ste": "sainte", "ft": "fort", "mt": "mount", "pt": "point"}
+
+
+def normalize_city_name(name):
+    """
+    Normalize a city name for index lookups.
+
+    Lowercases, drops punctuation, collapses whitespace and expands common
+    abbreviations, so "St. Louis" and "saint  louis" both become "saint louis".
+    """
+    words = re.sub(r"[^a-z0-9\s]", " ", name.lower()).split()
+    return " ".join(ABBREVIATIONS.get(word, word) for word in words)
+
+
+def parse_city_input(text):
+    """
+    Split user input into a normalized city name and optional state code.
+
+    Accepts "Portland", "Portland, ME", "Portland ME" and "Portland, Maine".
+
+    Returns:
+        tuple: (normalized_name, state_code or None)
+    """
+    if "," in text:
+        city, _, state = text.rpartition(",")
+        state_norm = normalize_city_name(state)
+        code = STATE_NAMES.get(state_norm) or (state_norm.upper() if state_norm.upper() in STATE_CODES else None)
+        if code:
+            return normalize_city_name(city), code
+        return normalize_city_name(text), None
+
+    name = normalize_city_name(text)
+    words = name.split()
+    if len(words) > 1 and words[-1].upper() in STATE_CODES and words[-1] not in ("la", "dc"):
+        return " ".join(words[:-1]), words[-1].upper()
+    return name, None
+
+
+def _place_name(census_name):
+    """Turn a Census place name into a city name ("Louisville/Jefferson County metro government (balance)" -> "Louisville")"""
+    name = census_name.strip()
+    consolidated = name.endswith("(balance)") or name.endswith(" County")
+    name = PLACE_TYPE_SUFFIX.sub("", name)
+    if consolidated:
+        name = re.split(r"[/-]", name)[0]
+    return name.strip()
+
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    """
+    Load places from a Census Gazetteer places file.
+
+    Args:
+        path (str): Path to the tab-separated file
+
+    Returns:
+        list: (name, state, lat, lon) tuples; empty if the file is missing
+    """
+    if not os.path.exists(path):
+        return []
+    places = []
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f, delimiter="\t")
+        # The Census files pad the last header with spaces
+        reader.fieldnames = [field.strip() for field in reader.fieldnames]
+        for row in reader:
+            state = row["USPS"].strip()
+            if state not in STATE_CODES:
+                continue
+            places.append((_place_name(row["NAME"]), state, float(row["INTPTLAT"]), float(row["INTPTLONG"])))
+    return places
+
+
+def _place_locations():
+    """CITY_LOCATIONS followed by the gazetteer places not already listed there or as hubs"""
+    known = {(normalize_city_name(name), state) for name, state, _, _ in CITY_LOCATIONS}
+    known.update((normalize_city_name(name), state) for name, state, _, _ in HUB_LOCATIONS.values())
+    places = list(CITY_LOCATIONS)
+    for place in load_gazetteer():
+        key = (normalize_city_name(place[0]), place[1])
+        if key not in known:
+            known.add(key)
+            places.append(place)
+    return places
+
+
+def _haversine_miles(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 3958.8 * 2 * math.asin(math.sqrt(a))
+
+
+def _build_index():
+    """
+    Build the name index.
+
+    Each normalized name maps to a list of entries, best match first:
+    ("hub", hub_key, state), ("city", (name, state, lat, lon), state) or
+    ("neighbor", (name, hub_key, distance), state).
+    """
+    index = {}
+
+    def add(name, entry):
+        index.setdefault(normalize_city_name(name), []).append(entry)
+
+    for hub_key in NEARBY_CITIES:
+        state = HUB_LOCATIONS[hub_key][1] if hub_key in HUB_LOCATIONS else None
+        add(hub_key, ("hub", hub_key, state))
+        if hub_key in HUB_LOCATIONS:
+            add(HUB_LOCATIONS[hub_key][0], ("hub", hub_key, state))
+    for alias, hub_key in HUB_ALIASES.items():
+        add(alias, ("hub", hub_key, HUB_LOCATIONS[hub_key][1]))
+    for location in PLACE_LOCATIONS:
+        add(location[0], ("city", location, location[1]))
+    for hub_key, neighbors in NEARBY_CITIES.items():
+        state = HUB_LOCATIONS[hub_key][1] if hub_key in HUB_LOCATIONS else None
+        for neighbor, distance in neighbors:
+            add(neighbor, ("neighbor", (neighbor, hub_key, distance), state))
+
+    # Drop duplicate entries (e.g. a hub key that equals its display name)
+    # and rank the rest; the sort is stable, so table order breaks ties
+    for name, entries in index.items():
+        index[name] = sorted(dict.fromkeys(entries), key=lambda entry: ENTRY_KIND_RANK[entry[0]])
+    return index
+
+
+PLACE_LOCATIONS = _place_locations()
+CITY_INDEX = _build_index()
+SORTED_CITY_NAMES = sorted(CITY_INDEX)
+
+# Hubs that have coordinates, as (hub_key, lat, lon)
+HUB_POINTS = [(key, loc[2], loc[3]) for key, loc in HUB_LOCATIONS.items() if key in NEARBY_CITIES]
+
+
+def _lookup(name):
+    """Find index entries for a normalized name, trying shorter and prefix matches"""
+    if name in CITY_INDEX:
+        return CITY_INDEX[name]
+
+    # "new york city center" -> "new york city" -> "new york"
+    words = name.split()
+    for end in range(len(words) - 1, 0, -1):
+        shorter = " ".join(words[:end])
+        if shorter in CITY_INDEX:
+            return CITY_INDEX[shorter]
+
+    # "san fran" -> "san francisco", only when exactly one city starts that way
+    if len(name) < MIN_PREFIX_LENGTH:
+        return []
+    position = bisect.bisect_left(SORTED_CITY_NAMES, name)
+    matches = SORTED_CITY_NAMES[position:position + 2]
+    if matches and matches[0].startswith(name) and (len(matches) == 1 or not matches[1].startswith(name)):
+        return CITY_INDEX[matches[0]]
+    return []
+
+
+def city_matches(text):
+    """
+    List every index entry matching user input, best match first.
+
+    Args:
+        text (str): City name, optionally followed by a state
+
+    Returns:
+        list: Index entries (see _build_index); only that state's when a state is given
+    """
+    name, state = parse_city_input(text)
+    if not name:
+        return []
+    entries = _lookup(name)
+    if state:
+        entries = [entry for entry in entries if entry[2] == state]
+    return entries
+
+
+def resolve_city(text):
+    """
+    Resolve user input to a single index entry.
+
+    Hubs come first, then hub neighbors, then other cities, so "Glendale"
+    is the Los Angeles neighbor rather than Glendale, AZ. Use
+    matching_states() to tell whether the input was ambiguous.
+
+    Args:
+        text (str): City name, optionally followed by a state
+
+    Returns:
+        tuple: Index entry (see _build_index), or None if the city is unknown
+    """
+    entries = city_matches(text)
+    return entries[0] if entries else None
+
+
+def matching_states(text):
+    """
+    List the states of the cities matching user input, best match first.
+
+    More than one state means the input is ambiguous and a state should be added.
+    """
+    return list(dict.fromkeys(entry[2] for entry in city_matches(text) if entry[2]))
+
+
+def city_name(entry):
+    """Return the display name of a resolved entry, e.g. "Portland" for "portland me\""""
+    kind, value, _ = entry
+    if kind == "hub":
+        return HUB_LOCATIONS[value][0] if value in HUB_LOCATIONS else value.title()
+    return value[0]
+
+
+def _hub_distances(entry, max_distance):
+    """Return {hub_key: distance} for hubs within max_distance of a resolved entry"""
+    kind, value, _ = entry
+    if kind == "hub":
+        if value not in HUB_LOCATIONS:
+            return {value: 0}
+        _, _, lat, lon = HUB_LOCATIONS[value]
+    elif kind == "city":
+        _, _, lat, lon = value
+    else:
+        _, hub_key, distance = value
+        hubs = {hub_key: distance}
+        if hub_key in HUB_LOCATIONS:
+            # Other hubs are at most this far away, via the neighbor's own hub
+            _, _, hub_lat, hub_lon = HUB_LOCATIONS[hub_key]
+            for key, lat, lon in HUB_POINTS:
+                if key != hub_key:
+                    via = distance + _haversine_miles(hub_lat, hub_lon, lat, lon)
+                    if via <= max_distance:
+                        hubs[key] = via
+        return hubs
+
+    hubs = {}
+    for key, hub_lat, hub_lon in HUB_POINTS:
+        distance = _haversine_miles(lat, lon, hub_lat, hub_lon)
+        if distance <= max_distance:
+            hubs[key] = distance
+    return hubs
+
+
+def _candidates(entry):
+    """
+    Collect every nearby city for a resolved entry with its distance.
+
+    Distances through a hub use the hub distance plus the neighbor's listed
+    distance, an upper bound on the true distance, so no city is placed
+    closer than it really is. Cities more than MAX_RADIUS_MILES away are left
+    out, except when no hub is in reach: then the nearest hub and its
+    neighbors are included at their real distances.
+    """
+    kind, value, _ = entry
+    own_name = city_name(entry)
+    lat = lon = None
+    if kind == "city":
+        lat, lon = value[2], value[3]
+    elif kind == "hub" and value in HUB_LOCATIONS:
+        lat, lon = HUB_LOCATIONS[value][2], HUB_LOCATIONS[value][3]
+
+    found = {}
+
+    def add(name, distance, limit=MAX_RADIUS_MILES):
+        if own_name and name.lower() == own_name.lower():
+            return
+        if distance <= limit and distance < found.get(name, float("inf")):
+            found[name] = distance
+
+    hubs = _hub_distances(entry, MAX_RADIUS_MILES)
+    hub_limit = MAX_RADIUS_MILES
+    if not hubs and lat is not None:
+        # Remote cities (Anchorage, Honolulu) still get the closest hub's area
+        distance, hub_key = min(
+            (_haversine_miles(lat, lon, hub_lat, hub_lon), key) for key, hub_lat, hub_lon in HUB_POINTS
+        )
+        hubs = {hub_key: distance}
+        hub_limit = float("inf")
+
+    for hub_key, hub_distance in hubs.items():
+        if hub_distance > 0:
+            add(city_name(("hub", hub_key, None)), hub_distance, hub_limit)
+        for neighbor, distance in NEARBY_CITIES[hub_key]:
+            add(neighbor, hub_distance + distance, hub_limit)
+
+    if lat is not None:
+        for name, _, city_lat, city_lon in PLACE_LOCATIONS:
+            add(name, _haversine_miles(lat, lon, city_lat, city_lon))
+    return found
+
+
+def find_nearby_cities(center_city, radius_miles, max_cities=20):
+    """
+    Get a list of cities near any US city in the bundled index, without geocoding.
+
+    Like hardcoded_cities.find_nearby_cities, the radius is widened in
+    10-mile steps (up to 100 miles) until at least 5 cities are found. If
+    fewer are found even then, the nearest cities beyond 100 miles (the
+    nearest hub's area, see _candidates) fill the list up to 5.
+
+    Args:
+        center_city (str): The central city, optionally with a state ("Portland, ME")
+        radius_miles (float): Radius in miles
+        max_cities (int): Maximum number of cities to return
+
+    Returns:
+        list: List of (city_name, distance) tuples, nearest first
+    """
+    entry = resolve_city(center_city)
+    if entry is None:
+        return []
+
+    candidates = sorted((distance, name) for name, distance in _candidates(entry).items())
+    current_radius = radius_miles
+    while True:
+        cities_in_radius = [(name, round(distance)) for distance, name in candidates if distance <= current_radius]
+        if len(cities_in_radius) >= MIN_RESULTS:
+            return cities_in_radius[:max_cities]
+        if current_radius >= MAX_RADIUS_MILES:
+            nearest = [(name, round(distance)) for distance, name in candidates[:MIN_RESULTS]]
+            return max(cities_in_radius, nearest, key=len)[:max_cities]
+        current_radius = min(current_radius + RADIUS_STEP_MILES, MAX_RADIUS_MILES)
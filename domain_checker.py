@@ -1,8 +1,122 @@
 import requests
-from time import sleep
+from time import sleep, monotonic
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 import socket
+import threading
 
-def check_domains(domains, delay=0.5, timeout=3):
+# Status for domains skipped because the search was cancelled or ran out of time
+UNCHECKED_STATUS = "Unchecked"
+
+# Status for domains whose check raised unexpectedly
+ERROR_STATUS = "Error"
+
+# Statuses that say nothing about whether the domain is registered
+NON_VERDICT_STATUSES = frozenset((UNCHECKED_STATUS, ERROR_STATUS))
+
+# How often a blocked DNS lookup checks whether it has been cancelled
+CANCEL_POLL_INTERVAL = 0.1
+
+# DNS lookups cannot be interrupted, so cancellable lookups run in this pool and
+# are abandoned on cancel. The pool is sized by configure_resolver_pool() for the
+# number of concurrent checks, with one extra thread per check so lookups
+# abandoned by cancelled searches do not hold up new ones.
+DEFAULT_RESOLVER_CHECKS = 16
+RESOLVER_THREADS_PER_CHECK = 2
+_RESOLVER_POOL = None
+_RESOLVER_POOL_SIZE = 0
+_RESOLVER_POOL_LOCK = threading.Lock()
+
+
+class SearchCancelled(Exception):
+    """Raised when a cancellable call is abandoned because its token was cancelled"""
+
+
+class CancelToken:
+    """Cooperative cancellation flag with an optional overall deadline"""
+
+    def __init__(self, deadline=None):
+        """
+        Args:
+            deadline (float, optional): Seconds from now after which the token counts as cancelled
+        """
+        self._event = threading.Event()
+        self.expires_at = monotonic() + deadline if deadline is not None else None
+
+    def cancel(self):
+        """Ask everything holding this token to stop"""
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        """True once cancel() was called or the deadline passed"""
+        return self._event.is_set() or (self.expires_at is not None and monotonic() >= self.expires_at)
+
+    def remaining(self):
+        """Seconds left before the deadline, or None if there is no deadline"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - monotonic())
+
+    def limit(self, timeout):
+        """Cap a timeout so it does not run past the deadline"""
+        remaining = self.remaining()
+        return timeout if remaining is None else min(timeout, remaining)
+
+    def wait(self, seconds):
+        """
+        Sleep for up to `seconds`, waking early if cancelled.
+
+        Returns:
+            bool: True if the token is cancelled
+        """
+        self._event.wait(self.limit(seconds))
+        return self.cancelled
+
+
+def configure_resolver_pool(concurrent_checks):
+    """
+    Make sure cancellable lookups can serve this many concurrent checks.
+
+    The pool only grows; a smaller request leaves it unchanged.
+
+    Args:
+        concurrent_checks (int): Checks that may resolve at the same time
+    """
+    global _RESOLVER_POOL, _RESOLVER_POOL_SIZE
+    size = max(1, concurrent_checks) * RESOLVER_THREADS_PER_CHECK
+    with _RESOLVER_POOL_LOCK:
+        if size <= _RESOLVER_POOL_SIZE:
+            return
+        old_pool = _RESOLVER_POOL
+        _RESOLVER_POOL = ThreadPoolExecutor(max_workers=size, thread_name_prefix="dns")
+        _RESOLVER_POOL_SIZE = size
+    if old_pool is not None:
+        # Lookups already running finish on the old pool
+        old_pool.shutdown(wait=False)
+
+
+def _resolver_pool():
+    if _RESOLVER_POOL is None:
+        configure_resolver_pool(DEFAULT_RESOLVER_CHECKS)
+    return _RESOLVER_POOL
+
+
+def _resolve(domain, cancel_token=None):
+    """Resolve a domain, giving up early if the token is cancelled"""
+    if cancel_token is None:
+        return socket.gethostbyname(domain)
+
+    future = _resolver_pool().submit(socket.gethostbyname, domain)
+    while True:
+        try:
+            return future.result(timeout=CANCEL_POLL_INTERVAL)
+        except FutureTimeout:
+            if cancel_token.cancelled:
+                future.cancel()
+                raise SearchCancelled(domain)
+
+
+def check_domains(domains, delay=0.5, timeout=3, cancel_token=None):
     """
     Check if a list of domains are available for registration.
     
@@ -10,42 +124,62 @@ def check_domains(domains, delay=0.5, timeout=3):
         domains (list): List of domain names to check
         delay (float): Delay between requests in seconds
         timeout (int): Request timeout in seconds
-        
+        cancel_token (CancelToken, optional): Stops the search early when cancelled
+            or past its deadline
+    
     Returns:
-        list: List of [domain, status] pairs
+        list: List of [domain, status] pairs. Domains not checked because the
+        search was cancelled have status UNCHECKED_STATUS.
     """
     results = []
     
-    for domain in domains:
+    for index, domain in enumerate(domains):
+        # Stop early and report the rest as unchecked
+        if cancel_token is not None and cancel_token.cancelled:
+            results.extend([remaining, UNCHECKED_STATUS] for remaining in domains[index:])
+            break
+
         # Check if domain resolves to an IP (registered)
         try:
             # Try to resolve the domain
-            socket.gethostbyname(domain)
+            _resolve(domain, cancel_token)
+            if cancel_token is not None and cancel_token.cancelled:
+                raise SearchCancelled(domain)
+            request_timeout = cancel_token.limit(timeout) if cancel_token is not None else timeout
             
             # If we get here, it resolved, so try to connect
             try:
                 # First try HTTPS
-                https_response = requests.get(f"https://{domain}", timeout=timeout, allow_redirects=True)
+                https_response = requests.get(f"https://{domain}", timeout=request_timeout, allow_redirects=True)
                 if https_response.status_code < 400:
                     status = "Registered (Active Website)"
                 else:
                     # If HTTPS fails, try HTTP
-                    http_response = requests.get(f"http://{domain}", timeout=timeout, allow_redirects=True)
+                    http_response = requests.get(f"http://{domain}", timeout=request_timeout, allow_redirects=True)
                     if http_response.status_code < 400:
                         status = "Registered (Active Website)"
                     else:
                         status = "Registered (No Active Website)"
             except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, Exception):
-                # Domain exists but no website
-                status = "Registered (No Active Website)"
+                if cancel_token is not None and cancel_token.cancelled:
+                    # The request was cut short by the deadline, so we don't know
+                    status = UNCHECKED_STATUS
+                else:
+                    # Domain exists but no website
+                    status = "Registered (No Active Website)"
         except socket.gaierror:
             # DNS lookup failed, domain likely available
             status = "Available"
+        except SearchCancelled:
+            status = UNCHECKED_STATUS
         
         results.append([domain, status])
         
         # Add delay to prevent getting blocked
         if delay > 0:
-            sleep(delay)
+            if cancel_token is not None:
+                cancel_token.wait(delay)
+            else:
+                sleep(delay)
             
     return results
@@ -0,0 +1,305 @@
+"""
+Append-only status history for checked domains.
+
+Every check result is appended to a SQLite table indexed by domain and time.
+A small "latest status" table records when each domain is next due for a
+re-check, so a scheduled job only re-resolves watched domains (opted in with
+set_watched) whose status TTL has expired (or is about to) and emits change
+events such as
+"Registered (No Active Website) → Available".
+"""
+
+import argparse
+import sqlite3
+import time
+from contextlib import closing
+from functools import partial
+
+from domain_checker import NON_VERDICT_STATUSES
+from rdap_verifier import RdapVerifier, RDAP_REGISTERED, REGISTERED_NO_DNS_STATUS
+from results import ResultSet
+from sharded_checker import check_domains_sharded, DEFAULT_THREADS_PER_WORKER
+
+HISTORY_DB_PATH = "domain_history.db"
+
+# How long a status is trusted before the domain is re-checked (seconds).
+# Available names are the ones users act on, so they are re-checked most often.
+STATUS_TTLS = {
+    "Available": 60 * 60,
+    "Registered (No Active Website)": 6 * 60 * 60,
+    REGISTERED_NO_DNS_STATUS: 6 * 60 * 60,
+    "Registered (Active Website)": 24 * 60 * 60,
+}
+DEFAULT_STATUS_TTL = 60 * 60
+
+# Domains expiring within this window are picked up by the next hourly run
+RECHECK_MARGIN = 10 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS status_history (
+    domain TEXT NOT NULL,
+    status TEXT NOT NULL,
+    checked_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_status_history_domain_time
+    ON status_history (domain, checked_at);
+CREATE TABLE IF NOT EXISTS domain_status (
+    domain TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    checked_at REAL NOT NULL,
+    next_check_at REAL NOT NULL,
+    watched INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_domain_status_next_check
+    ON domain_status (watched, next_check_at);
+"""
+
+
+def connect(db_path=HISTORY_DB_PATH):
+    """
+    Open the history database, creating the schema if needed.
+
+    Args:
+        db_path (str): Path to the SQLite database file
+
+    Returns:
+        sqlite3.Connection: Open connection
+    """
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def status_ttl(status):
+    """Return how long (in seconds) a status is trusted before re-checking"""
+    return STATUS_TTLS.get(status, DEFAULT_STATUS_TTL)
+
+
+def record_results(results, checked_at=None, db_path=HISTORY_DB_PATH):
+    """
+    Append check results to the history and detect status changes.
+
+    Args:
+        results (list): List of [domain, status] pairs; unchecked and errored entries are skipped
+        checked_at (float, optional): Unix timestamp of the check (defaults to now)
+        db_path (str): Path to the SQLite database file
+
+    Returns:
+        list: Change events as dicts with domain, old_status, new_status and
+        checked_at keys, for domains whose status differs from the last check
+    """
+    checked_at = time.time() if checked_at is None else checked_at
+    events = []
+    with closing(connect(db_path)) as conn, conn:
+        for domain, status in results:
+            if status in NON_VERDICT_STATUSES:
+                continue
+            domain = domain.lower()
+            row = conn.execute(
+                "SELECT status FROM domain_status WHERE domain = ?", (domain,)
+            ).fetchone()
+            if row and row[0] != status:
+                events.append({
+                    "domain": domain,
+                    "old_status": row[0],
+                    "new_status": status,
+                    "checked_at": checked_at,
+                })
+            conn.execute(
+                "INSERT INTO status_history (domain, status, checked_at) VALUES (?, ?, ?)",
+                (domain, status, checked_at),
+            )
+            conn.execute(
+                """
+                INSERT INTO domain_status (domain, status, checked_at, next_check_at, watched)
+                VALUES (?, ?, ?, ?, 0)
+                ON CONFLICT(domain) DO UPDATE SET
+                    status = excluded.status,
+                    checked_at = excluded.checked_at,
+                    next_check_at = excluded.next_check_at
+                """,
+                (domain, status, checked_at, checked_at + status_ttl(status)),
+            )
+    return events
+
+
+def set_watched(domains, watched=True, db_path=HISTORY_DB_PATH):
+    """
+    Turn scheduled re-checking on or off for domains already in the history.
+
+    Args:
+        domains (list): Domain names
+        watched (bool): Whether the re-check job should monitor them
+        db_path (str): Path to the SQLite database file
+    """
+    with closing(connect(db_path)) as conn, conn:
+        conn.executemany(
+            "UPDATE domain_status SET watched = ? WHERE domain = ?",
+            [(int(watched), domain.lower()) for domain in domains],
+        )
+
+
+def get_due_domains(now=None, margin=RECHECK_MARGIN, limit=None, db_path=HISTORY_DB_PATH):
+    """
+    List watched domains whose status has expired or expires within the margin.
+
+    Args:
+        now (float, optional): Unix timestamp to compare against (defaults to now)
+        margin (float): Also include domains expiring within this many seconds
+        limit (int, optional): Maximum number of domains to return
+        db_path (str): Path to the SQLite database file
+
+    Returns:
+        list: Domain names, the most overdue first
+    """
+    now = time.time() if now is None else now
+    query = (
+        "SELECT domain FROM domain_status WHERE watched = 1 AND next_check_at <= ? "
+        "ORDER BY next_check_at"
+    )
+    params = [now + margin]
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    with closing(connect(db_path)) as conn:
+        return [row[0] for row in conn.execute(query, params)]
+
+
+def get_latest_statuses(domains, db_path=HISTORY_DB_PATH):
+    """
+    Get the most recent recorded status of each domain.
+
+    Args:
+        domains (list): Domain names
+        db_path (str): Path to the SQLite database file
+
+    Returns:
+        dict: Lowercased domain to status, for domains present in the history
+    """
+    statuses = {}
+    with closing(connect(db_path)) as conn:
+        for domain in domains:
+            row = conn.execute(
+                "SELECT status FROM domain_status WHERE domain = ?", (domain.lower(),)
+            ).fetchone()
+            if row:
+                statuses[domain.lower()] = row[0]
+    return statuses
+
+
+def confirm_rdap_verdicts(results, previous, verifier):
+    """
+    Re-confirm with RDAP the domains RDAP last found registered but DNS now calls available.
+
+    A DNS-only check cannot tell a lapsed registration from a registered name
+    without delegation, so it must not overwrite an RDAP verdict on its own.
+
+    Args:
+        results (ResultSet or list): [domain, status] pairs from the DNS check
+        previous (dict): Lowercased domain to previously recorded status
+        verifier (RdapVerifier): Verifier used for the lookups
+
+    Returns:
+        ResultSet: Results with those domains marked REGISTERED_NO_DNS_STATUS or
+        "Available" as RDAP reports; domains RDAP could not answer for are
+        dropped so their previous status stands
+    """
+    candidates = {
+        domain for domain, status in results
+        if status == "Available" and previous.get(domain.lower()) == REGISTERED_NO_DNS_STATUS
+    }
+    if not candidates:
+        return ResultSet.from_pairs(results)
+    answers = verifier.verify(list(candidates))
+    confirmed = ResultSet()
+    for domain, status in results:
+        if domain in candidates:
+            answer = answers.get(domain.lower())
+            if answer is None:
+                continue
+            if answer == RDAP_REGISTERED:
+                status = REGISTERED_NO_DNS_STATUS
+        confirmed.append(domain, status)
+    return confirmed
+
+
+def get_domain_history(domain, db_path=HISTORY_DB_PATH):
+    """
+    Get every recorded status for a domain.
+
+    Args:
+        domain (str): Domain name
+        db_path (str): Path to the SQLite database file
+
+    Returns:
+        list: List of (checked_at, status) tuples, oldest first
+    """
+    with closing(connect(db_path)) as conn:
+        return conn.execute(
+            "SELECT checked_at, status FROM status_history WHERE domain = ? ORDER BY checked_at",
+            (domain.lower(),),
+        ).fetchall()
+
+
+def format_change_event(event):
+    """Format a change event as 'domain: old → new'"""
+    return f"{event['domain']}: {event['old_status']} → {event['new_status']}"
+
+
+def run_recheck(delay=0.5, timeout=3, limit=None, checker=None, db_path=HISTORY_DB_PATH,
+                workers=None, threads_per_worker=DEFAULT_THREADS_PER_WORKER, verifier=None):
+    """
+    Re-check the watched domains that are due and record the results.
+
+    Intended to be run from a scheduler (e.g. hourly cron). Domains are checked
+    concurrently with check_domains_sharded so large watch lists finish well
+    within the hour. Domains last recorded as REGISTERED_NO_DNS_STATUS that DNS
+    now reports as available are confirmed with RDAP (see confirm_rdap_verdicts).
+
+    Args:
+        delay (float): Delay between requests in seconds (per checking thread)
+        timeout (int): Request timeout in seconds
+        limit (int, optional): Maximum number of domains to re-check in this run
+        checker (callable, optional): Function with the check_domains signature
+            (defaults to check_domains_sharded)
+        db_path (str): Path to the SQLite database file
+        workers (int, optional): Worker processes for the default checker
+            (defaults to CPU count)
+        threads_per_worker (int): Concurrent checks per worker for the default checker
+        verifier (RdapVerifier, optional): Verifier for RDAP confirmations
+            (one is created and closed if needed)
+
+    Returns:
+        list: Change events detected during this run
+    """
+    due = get_due_domains(limit=limit, db_path=db_path)
+    if not due:
+        return []
+    if checker is None:
+        checker = partial(check_domains_sharded, workers=workers, threads_per_worker=threads_per_worker)
+    previous = get_latest_statuses(due, db_path=db_path)
+    results = checker(due, delay=delay, timeout=timeout)
+    if REGISTERED_NO_DNS_STATUS in previous.values():
+        own_verifier = verifier is None
+        verifier = verifier or RdapVerifier()
+        try:
+            results = confirm_rdap_verdicts(results, previous, verifier)
+        finally:
+            if own_verifier:
+                verifier.close()
+    return record_results(results, db_path=db_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-check watched domains whose status is due")
+    parser.add_argument("--db", default=HISTORY_DB_PATH, help="Path to the history database")
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--timeout", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to CPU count)")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS_PER_WORKER,
+                        help="Concurrent checks per worker process")
+    args = parser.parse_args()
+    for event in run_recheck(args.delay, args.timeout, args.limit, db_path=args.db,
+                             workers=args.workers, threads_per_worker=args.threads):
+        print(format_change_event(event))
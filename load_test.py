@@ -0,0 +1,449 @@
+"""
+Load-test harness that simulates concurrent Streamlit users of app.py.
+
+Each simulated session is a streamlit.testing AppTest instance running the real
+app script in this process, so sessions share the check scheduler, RDAP
+verifier and saved-search directory exactly as they do in production. DNS,
+HTTP and geocoding are replaced with local stubs with configurable latency,
+so runs are repeatable and never touch the network.
+
+Usage:
+    python load_test.py --sessions 20 --duration 60 --flows manual,radius,saved
+
+Reports latency percentiles and error rates per flow, plus process CPU and
+peak RSS.
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import random
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from unittest import mock
+from urllib import parse
+
+import streamlit
+from geopy.location import Location
+from streamlit import logger as streamlit_logger
+
+# ConcurrentAppTest re-implements the private AppTest._run on top of these
+# streamlit.testing internals, which can change in any minor release. The
+# harness is known to work with this version (the one in requirements.txt).
+TESTED_STREAMLIT_VERSION = "1.45.1"
+STREAMLIT_UNSUPPORTED = (
+    f"load_test.py relies on streamlit.testing internals (tested with Streamlit {TESTED_STREAMLIT_VERSION}) "
+    f"that changed in the installed Streamlit {streamlit.__version__}"
+)
+
+try:
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.pages_manager import PagesManager
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+    from streamlit.testing.v1.util import patch_config_options
+except ImportError as e:
+    raise ImportError(f"{STREAMLIT_UNSUPPORTED}: {e}. Install streamlit=={TESTED_STREAMLIT_VERSION}.") from e
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(APP_DIR, "app.py")
+
+FLOWS = ("manual", "radius", "saved")
+DEFAULT_CITIES = ["Dallas", "Fort Worth", "Arlington", "Plano", "Irving", "Garland", "Frisco", "Denton"]
+DEFAULT_RADIUS_CITIES = ["Dallas", "Houston", "Plano", "Portland, ME", "Glendale", "Chicago"]
+APP_TIMEOUT = 600
+
+
+def _bucket(key):
+    """Map a string to a stable number in [0, 1)"""
+    digest = hashlib.sha1(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") / 2 ** 32
+
+
+class StubResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class StubBackends:
+    """Patches DNS, HTTP and geocoding with deterministic local stubs"""
+
+    def __init__(self, dns_latency=0.02, http_latency=0.05, geocode_latency=0.05,
+                 registered_ratio=0.6, active_ratio=0.5):
+        """
+        Args:
+            dns_latency (float): Seconds per DNS lookup
+            http_latency (float): Seconds per HTTP request
+            geocode_latency (float): Seconds per geocoder query
+            registered_ratio (float): Fraction of domains that resolve
+            active_ratio (float): Fraction of resolving domains with a website
+        """
+        self.dns_latency = dns_latency
+        self.http_latency = http_latency
+        self.geocode_latency = geocode_latency
+        self.registered_ratio = registered_ratio
+        self.active_ratio = active_ratio
+        self._patches = [
+            mock.patch("socket.gethostbyname", self.gethostbyname),
+            mock.patch("requests.get", self.get),
+            mock.patch("geopy.geocoders.Nominatim.geocode", self.geocode),
+        ]
+
+    def gethostbyname(self, host):
+        time.sleep(self.dns_latency)
+        if _bucket(host) < self.registered_ratio:
+            return "127.0.0.1"
+        raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+
+    def get(self, url, timeout=None, **kwargs):
+        time.sleep(self.http_latency)
+        host = url.split("://", 1)[-1].split("/", 1)[0]
+        return StubResponse(200 if _bucket("http:" + host) < self.active_ratio else 404)
+
+    def geocode(self, query, timeout=None, **kwargs):
+        time.sleep(self.geocode_latency)
+        # Somewhere in the continental US, stable per query
+        latitude = 25 + _bucket("lat:" + query) * 23
+        longitude = -124 + _bucket("lon:" + query) * 57
+        return Location(query, (latitude, longitude, 0), {})
+
+    def __enter__(self):
+        for patch in self._patches:
+            patch.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for patch in reversed(self._patches):
+            patch.stop()
+        return False
+
+
+class ConcurrentAppTest(AppTest):
+    """
+    AppTest whose script runs can overlap with other sessions in this process.
+
+    AppTest installs a mock Runtime and a config patch around every run and
+    removes them afterwards, which breaks any session still running. Here they
+    are installed once for the whole load test by shared_test_runtime(), and
+    the script cache is shared between sessions as it is in the real server.
+    """
+
+    script_cache = ScriptCache()
+
+    def _run(self, widget_state=None, timeout=None):
+        if timeout is None:
+            timeout = self.default_timeout
+        pages_manager = PagesManager(self._script_path, self.script_cache, setup_watcher=False)
+        script_runner = LocalScriptRunner(
+            self._script_path, self.session_state, pages_manager, args=self.args, kwargs=self.kwargs
+        )
+        self._tree = script_runner.run(widget_state, self.query_params, timeout, self._page_hash)
+        self._tree._runner = self
+        try:
+            query_string = script_runner.event_data[-1]["client_state"].query_string
+        except (AttributeError, IndexError, KeyError, TypeError) as e:
+            raise RuntimeError(f"{STREAMLIT_UNSUPPORTED}: LocalScriptRunner.event_data: {e!r}") from e
+        self.query_params = parse.parse_qs(query_string)
+        return self
+
+
+# Parameters of the internals that ConcurrentAppTest calls or overrides
+REQUIRED_SIGNATURES = {
+    AppTest._run: ("widget_state", "timeout"),
+    LocalScriptRunner.__init__: ("script_path", "session_state", "pages_manager", "args", "kwargs"),
+    LocalScriptRunner.run: ("widget_state", "query_params", "timeout", "page_hash"),
+    PagesManager.__init__: ("main_script_path", "script_cache", "setup_watcher"),
+}
+REQUIRED_APPTEST_ATTRIBUTES = (
+    "_script_path", "default_timeout", "session_state", "args", "kwargs", "query_params", "_page_hash",
+)
+
+
+def check_streamlit_internals():
+    """
+    Fail fast if the Streamlit internals used by ConcurrentAppTest have changed.
+
+    Raises:
+        RuntimeError: If a required parameter or AppTest attribute is missing
+    """
+    problems = []
+    for function, params in REQUIRED_SIGNATURES.items():
+        signature = inspect.signature(function)
+        accepts_kwargs = any(p.kind is p.VAR_KEYWORD for p in signature.parameters.values())
+        missing = [p for p in params if p not in signature.parameters and not accepts_kwargs]
+        if missing:
+            problems.append(f"{function.__qualname__} has no {', '.join(missing)}")
+    app_test = ConcurrentAppTest(APP_PATH, default_timeout=APP_TIMEOUT)
+    missing = [name for name in REQUIRED_APPTEST_ATTRIBUTES if not hasattr(app_test, name)]
+    if missing:
+        problems.append(f"AppTest has no {', '.join(missing)}")
+    if problems:
+        raise RuntimeError(
+            f"{STREAMLIT_UNSUPPORTED}: {'; '.join(problems)}. Install streamlit=={TESTED_STREAMLIT_VERSION}."
+        )
+    if streamlit.__version__ != TESTED_STREAMLIT_VERSION:
+        print(f"Warning: load_test.py was tested with Streamlit {TESTED_STREAMLIT_VERSION}, "
+              f"running with {streamlit.__version__}")
+
+
+@contextmanager
+def shared_test_runtime():
+    """Install the mock Streamlit runtime shared by all ConcurrentAppTest sessions"""
+    mock_runtime = mock.MagicMock(spec=Runtime)
+    mock_runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    mock_runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = mock_runtime
+    try:
+        with patch_config_options({"global.appTest": True}):
+            yield mock_runtime
+    finally:
+        Runtime._instance = None
+
+
+def _button(at, label):
+    return next(button for button in at.button if button.label == label)
+
+
+class SimulatedSession:
+    """One simulated user driving the app through its main flows"""
+
+    def __init__(self, session_index, business_type="plumber", cities_per_search=5, delay=0.1):
+        self.rng = random.Random(session_index)
+        self.business_type = business_type
+        self.cities_per_search = cities_per_search
+        self.delay = delay
+        self.at = None
+
+    def start(self):
+        """Open the app, as a new browser tab would"""
+        self.at = ConcurrentAppTest(APP_PATH, default_timeout=APP_TIMEOUT).run()
+        self._raise_on_exception()
+        self.at.text_input[0].input(self.business_type)
+        self.at.slider[0].set_value(self.delay)
+
+    def _raise_on_exception(self):
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+
+    def run_flow(self, flow):
+        """Run one flow and raise if the app reported an exception"""
+        if self.at.exception:
+            # The last run failed part-way; reload the page like a user would
+            self.at.run()
+        getattr(self, f"flow_{flow}")()
+        self._raise_on_exception()
+
+    def flow_manual(self):
+        cities = self.rng.sample(DEFAULT_CITIES, min(self.cities_per_search, len(DEFAULT_CITIES)))
+        self.at.text_area[0].input("\n".join(cities))
+        _button(self.at, "Check Domain Availability").click().run()
+
+    def flow_radius(self):
+        self.at.text_input[1].input(self.rng.choice(DEFAULT_RADIUS_CITIES))
+        _button(self.at, "Find Nearby Cities").click().run()
+        self._raise_on_exception()
+        if any(button.label == "Check Domains for These Cities" for button in self.at.button):
+            _button(self.at, "Check Domains for These Cities").click().run()
+
+    def flow_saved(self):
+        # A plain rerun renders the Saved Searches tab, which rescans the directory
+        self.at.run()
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile (0-100) of a list using nearest rank"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def run_load_test(sessions=10, duration=30, flows=FLOWS, cities_per_search=5, delay=0.1,
+                  think_time=0.5, backends=None):
+    """
+    Drive concurrent simulated sessions through the app and collect metrics.
+
+    Args:
+        sessions (int): Number of concurrent simulated users
+        duration (float): Seconds to keep starting new flows
+        flows (tuple): Flow names to cycle through ("manual", "radius", "saved")
+        cities_per_search (int): Cities entered per manual search
+        delay (float): Value for the app's delay slider
+        think_time (float): Maximum random pause between a user's flows
+        backends (StubBackends, optional): Stub configuration (defaults used if None)
+
+    Returns:
+        dict: Per-flow latency percentiles and error rates, CPU and RSS usage
+
+    Raises:
+        RuntimeError: If the installed Streamlit is not supported (see check_streamlit_internals)
+    """
+    check_streamlit_internals()
+    latencies = {flow: [] for flow in flows}
+    errors = {flow: [] for flow in flows}
+    # CPU spent on the session threads themselves: AppTest tree parsing and widget handling.
+    # The app script runs on the runner's own thread, so this is the harness's share.
+    client_cpu = [0.0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def session_loop(session_index):
+        try:
+            run_session(session_index)
+        finally:
+            with lock:
+                client_cpu[0] += time.thread_time()
+
+    def run_session(session_index):
+        session = SimulatedSession(session_index, cities_per_search=cities_per_search, delay=delay)
+        try:
+            session.start()
+        except Exception:
+            with lock:
+                errors.setdefault("start", []).append(traceback.format_exc(limit=3))
+            return
+        flow_index = session_index
+        while time.monotonic() < stop_at:
+            flow = flows[flow_index % len(flows)]
+            flow_index += 1
+            started = time.perf_counter()
+            try:
+                session.run_flow(flow)
+            except Exception:
+                with lock:
+                    errors[flow].append(traceback.format_exc(limit=3))
+            else:
+                with lock:
+                    latencies[flow].append(time.perf_counter() - started)
+            time.sleep(session.rng.uniform(0, think_time))
+
+    # Sessions import the app's sibling modules after the chdir below
+    if APP_DIR not in sys.path:
+        sys.path.insert(0, APP_DIR)
+    work_dir = tempfile.mkdtemp(prefix="domainhunter-load-")
+    previous_dir = os.getcwd()
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    rss_before = usage_before.ru_maxrss
+    wall_started = time.perf_counter()
+    # The app writes saved searches and history relative to the working directory
+    os.chdir(work_dir)
+    try:
+        with backends or StubBackends(), shared_test_runtime():
+            threads = [threading.Thread(target=session_loop, args=(i,), daemon=True) for i in range(sessions)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        os.chdir(previous_dir)
+    wall_time = time.perf_counter() - wall_started
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    cpu_time = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+    app_cpu = max(cpu_time - client_cpu[0], 0.0)
+    report = {
+        "sessions": sessions,
+        "duration": round(wall_time, 2),
+        # Process totals: the simulated clients run in the same process as the app
+        "cpu_seconds": round(cpu_time, 2),
+        "cpu_cores_used": round(cpu_time / wall_time, 2) if wall_time else None,
+        "client_cpu_seconds": round(client_cpu[0], 2),
+        "app_cpu_seconds": round(app_cpu, 2),
+        "app_cpu_cores_used": round(app_cpu / wall_time, 2) if wall_time else None,
+        # ru_maxrss is reported in kilobytes on Linux. The baseline is the process before any
+        # session starts; growth above it includes the clients' element trees as well as the app.
+        "baseline_rss_mb": round(rss_before / 1024, 1),
+        "peak_rss_mb": round(usage_after.ru_maxrss / 1024, 1),
+        "work_dir": work_dir,
+        "flows": {},
+    }
+    for flow in list(latencies) + [name for name in errors if name not in latencies]:
+        samples = latencies.get(flow, [])
+        failures = errors.get(flow, [])
+        total = len(samples) + len(failures)
+        report["flows"][flow] = {
+            "requests": total,
+            "errors": len(failures),
+            "error_rate": round(len(failures) / total, 4) if total else 0.0,
+            "p50": percentile(samples, 50),
+            "p90": percentile(samples, 90),
+            "p99": percentile(samples, 99),
+            "max": max(samples) if samples else None,
+            "first_error": failures[0] if failures else None,
+        }
+    return report
+
+
+def format_report(report):
+    """Format a run_load_test report as a text table"""
+    def fmt(value):
+        return "-" if value is None else f"{value:.3f}"
+
+    lines = [
+        f"Sessions: {report['sessions']}  Duration: {report['duration']}s",
+        f"CPU (app + simulated clients): {report['cpu_seconds']}s ({report['cpu_cores_used']} cores)  "
+        f"clients: {report['client_cpu_seconds']}s  "
+        f"app: {report['app_cpu_seconds']}s ({report['app_cpu_cores_used']} cores)",
+        f"Peak RSS (app + simulated clients): {report['peak_rss_mb']} MB  "
+        f"(baseline before sessions: {report['baseline_rss_mb']} MB)",
+        f"{'flow':<8} {'reqs':>6} {'errors':>7} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}",
+    ]
+    for flow, stats in report["flows"].items():
+        lines.append(
+            f"{flow:<8} {stats['requests']:>6} {stats['error_rate']:>7.1%} {fmt(stats['p50']):>8} "
+            f"{fmt(stats['p90']):>8} {fmt(stats['p99']):>8} {fmt(stats['max']):>8}"
+        )
+    for flow, stats in report["flows"].items():
+        if stats["first_error"]:
+            lines.append(f"\nFirst {flow} error:\n{stats['first_error']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate concurrent users of the Streamlit app")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to keep starting flows")
+    parser.add_argument("--flows", default=",".join(FLOWS), help="Comma-separated flows to run")
+    parser.add_argument("--cities", type=int, default=5, help="Cities per manual search")
+    parser.add_argument("--delay", type=float, default=0.1, help="App delay slider value")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Max pause between flows")
+    parser.add_argument("--dns-latency", type=float, default=0.02)
+    parser.add_argument("--http-latency", type=float, default=0.05)
+    parser.add_argument("--geocode-latency", type=float, default=0.05)
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    # Per-rerun debug logging from the test runner would dominate the measurements
+    streamlit_logger.set_log_level("error")
+
+    flows = tuple(flow.strip() for flow in args.flows.split(",") if flow.strip())
+    unknown = [flow for flow in flows if flow not in FLOWS]
+    if unknown:
+        parser.error(f"Unknown flows: {', '.join(unknown)}")
+
+    report = run_load_test(
+        sessions=args.sessions,
+        duration=args.duration,
+        flows=flows,
+        cities_per_search=args.cities,
+        delay=args.delay,
+        think_time=args.think_time,
+        backends=StubBackends(args.dns_latency, args.http_latency, args.geocode_latency),
+    )
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
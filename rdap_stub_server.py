@@ -0,0 +1,142 @@
+"""
+Local RDAP stub server for testing and benchmarking the RDAP verifier offline.
+
+Answers GET /domain/<name> with 200 and a minimal RDAP domain object for names
+in its registered set, and 404 for everything else.
+
+Run `python rdap_stub_server.py --benchmark` to measure verifier accuracy and
+throughput against the stub.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rdap_verifier import RDAP_REGISTERED, RDAP_AVAILABLE, RdapVerifier
+
+
+def make_handler(registered, latency=0.0):
+    """
+    Build a request handler class serving the given registered domains.
+
+    Args:
+        registered (set): Lowercase domain names to report as registered
+        latency (float): Artificial delay per request in seconds
+
+    Returns:
+        type: BaseHTTPRequestHandler subclass
+    """
+    class RdapStubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            prefix = "/domain/"
+            domain = self.path[len(prefix):].lower() if self.path.startswith(prefix) else None
+            if domain and domain in registered:
+                status = 200
+                body = {"objectClassName": "domain", "ldhName": domain, "status": ["active"]}
+            else:
+                status = 404
+                body = {"errorCode": 404, "title": "Not Found"}
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/rdap+json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return RdapStubHandler
+
+
+def start_stub_server(registered, host="127.0.0.1", port=0, latency=0.0):
+    """
+    Start the stub server in a background thread.
+
+    Args:
+        registered (iterable): Domain names to report as registered
+        host (str): Interface to bind
+        port (int): Port to bind (0 picks a free port)
+        latency (float): Artificial delay per request in seconds
+
+    Returns:
+        tuple: (server, base_url); call server.shutdown() to stop it
+    """
+    handler = make_handler({domain.lower() for domain in registered}, latency)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/"
+
+
+def run_benchmark(num_domains=2000, registered_ratio=0.3, latency=0.01, pool_size=20, rate=1000.0):
+    """
+    Measure verifier accuracy and throughput against a local stub.
+
+    Args:
+        num_domains (int): Number of candidate domains to verify
+        registered_ratio (float): Fraction of candidates the stub reports as registered
+        latency (float): Artificial server delay per request in seconds
+        pool_size (int): Verifier connection pool size and concurrency
+        rate (float): Rate budget for the stub host in requests per second
+
+    Returns:
+        dict: accuracy, elapsed seconds and lookups per second
+    """
+    domains = [f"benchmark{i}.com" for i in range(num_domains)]
+    registered = set(random.sample(domains, int(num_domains * registered_ratio)))
+    server, base_url = start_stub_server(registered, latency=latency)
+    host = server.server_address
+    verifier = RdapVerifier(
+        base_urls={"com": base_url},
+        pool_size=pool_size,
+        rate_budgets={f"{host[0]}:{host[1]}": rate}
+    )
+    try:
+        started = time.perf_counter()
+        answers = verifier.verify(domains)
+        elapsed = time.perf_counter() - started
+    finally:
+        verifier.close()
+        server.shutdown()
+
+    correct = sum(
+        answers[domain] == (RDAP_REGISTERED if domain in registered else RDAP_AVAILABLE)
+        for domain in domains
+    )
+    return {
+        "accuracy": correct / num_domains,
+        "elapsed": elapsed,
+        "lookups_per_second": num_domains / elapsed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local RDAP stub server")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--registered", nargs="*", default=[], help="Domains to report as registered")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--benchmark", action="store_true", help="Benchmark the verifier and exit")
+    parser.add_argument("--domains", type=int, default=2000, help="Benchmark size")
+    parser.add_argument("--pool-size", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        stats = run_benchmark(args.domains, latency=args.latency or 0.01, pool_size=args.pool_size)
+        print(f"Accuracy: {stats['accuracy']:.1%}")
+        print(f"Verified {args.domains} domains in {stats['elapsed']:.2f}s "
+              f"({stats['lookups_per_second']:.0f} lookups/s)")
+    else:
+        server, base_url = start_stub_server(args.registered, port=args.port, latency=args.latency)
+        print(f"RDAP stub listening on {base_url} (set RDAP_BASE_URL={base_url} to use it)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
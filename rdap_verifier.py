@@ -0,0 +1,221 @@
+"""
+Optional RDAP confirmation stage for domains DNS marks as available.
+
+A domain that is registered but has no delegation does not resolve, so the
+DNS check reports it as "Available". This module asks the registry's RDAP
+server (HTTP/JSON) about those candidates and downgrades the ones that turn
+out to be registered. Requests share a pooled session, are throttled by a
+per-registry rate budget, and answers are cached with TTLs.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# RDAP base URLs per TLD (from the IANA RDAP bootstrap registry)
+RDAP_BASE_URLS = {
+    "com": "https://rdap.verisign.com/com/v1/",
+    "net": "https://rdap.verisign.com/net/v1/",
+    "org": "https://rdap.publicinterestregistry.org/rdap/",
+    "io": "https://rdap.identitydigital.services/rdap/",
+    "co": "https://rdap.registry.co/co/",
+}
+
+# Point every TLD at one server, e.g. a local stub: RDAP_BASE_URL=http://127.0.0.1:8080/
+RDAP_BASE_URL_ENV = "RDAP_BASE_URL"
+
+# Requests per second allowed per registry host
+DEFAULT_RATE_BUDGET = 5.0
+RATE_BUDGETS = {
+    "rdap.verisign.com": 10.0,
+}
+
+# Registrations rarely lapse, so positive answers are cached longer
+REGISTERED_CACHE_TTL = 24 * 60 * 60
+AVAILABLE_CACHE_TTL = 15 * 60
+
+RDAP_REGISTERED = "registered"
+RDAP_AVAILABLE = "available"
+
+# Status shown for names DNS considered available but RDAP says are taken
+REGISTERED_NO_DNS_STATUS = "Registered (No DNS)"
+
+
+class RateBudget:
+    """Token bucket limiting requests per second to one registry"""
+
+    def __init__(self, rate):
+        if rate <= 0:
+            raise ValueError(f"Rate budget must be positive, got {rate}")
+        self.rate = rate
+        # A request needs a whole token, so budgets under 1/s still hold one
+        self.capacity = max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cancel_token=None):
+        """
+        Block until a request may be sent.
+
+        Args:
+            cancel_token (CancelToken, optional): Stop waiting once cancelled
+
+        Returns:
+            bool: True if a request may be sent, False if the token was cancelled
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if cancel_token is None:
+                time.sleep(wait)
+            elif cancel_token.wait(wait):
+                return False
+
+
+class RdapVerifier:
+    """Batches RDAP lookups over pooled connections with rate budgets and a TTL cache"""
+
+    def __init__(self, base_urls=None, pool_size=10, timeout=5, rate_budgets=None):
+        """
+        Args:
+            base_urls (dict, optional): TLD to RDAP base URL (defaults to
+                RDAP_BASE_URLS, or RDAP_BASE_URL_ENV for every TLD if set)
+            pool_size (int): Concurrent lookups and pooled connections per host
+            timeout (int): Request timeout in seconds
+            rate_budgets (dict, optional): Host to requests-per-second overrides
+        """
+        override = os.environ.get(RDAP_BASE_URL_ENV)
+        if base_urls is None:
+            base_urls = {tld: override for tld in RDAP_BASE_URLS} if override else RDAP_BASE_URLS
+        self.base_urls = base_urls
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.rate_budgets = dict(RATE_BUDGETS, **(rate_budgets or {}))
+        self._budgets = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(set(base_urls.values())) or 1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Accept"] = "application/rdap+json"
+
+    def _budget_for(self, host):
+        with self._lock:
+            if host not in self._budgets:
+                self._budgets[host] = RateBudget(self.rate_budgets.get(host, DEFAULT_RATE_BUDGET))
+            return self._budgets[host]
+
+    def _cached(self, domain):
+        with self._lock:
+            entry = self._cache.get(domain)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            return None
+
+    def _store(self, domain, answer):
+        ttl = REGISTERED_CACHE_TTL if answer == RDAP_REGISTERED else AVAILABLE_CACHE_TTL
+        with self._lock:
+            self._cache[domain] = (answer, time.monotonic() + ttl)
+
+    def lookup(self, domain, cancel_token=None):
+        """
+        Ask RDAP whether a single domain is registered.
+
+        Args:
+            domain (str): Domain name
+            cancel_token (CancelToken, optional): Skip the lookup once cancelled;
+                its deadline also caps the request timeout
+
+        Returns:
+            str: RDAP_REGISTERED, RDAP_AVAILABLE, or None if RDAP could not tell
+        """
+        domain = domain.lower()
+        cached = self._cached(domain)
+        if cached is not None:
+            return cached
+
+        base_url = self.base_urls.get(domain.rsplit(".", 1)[-1])
+        if not base_url:
+            return None
+
+        if not self._budget_for(urlparse(base_url).netloc).acquire(cancel_token):
+            return None
+        timeout = self.timeout
+        if cancel_token is not None:
+            timeout = cancel_token.limit(timeout)
+            if cancel_token.cancelled or timeout <= 0:
+                return None
+        try:
+            response = self.session.get(f"{base_url.rstrip('/')}/domain/{domain}", timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            print(f"RDAP lookup failed for {domain}: {e}")
+            return None
+
+        if response.status_code == 200:
+            answer = RDAP_REGISTERED
+        elif response.status_code == 404:
+            answer = RDAP_AVAILABLE
+        else:
+            # Rate limited or server error: leave the DNS verdict in place
+            return None
+        self._store(domain, answer)
+        return answer
+
+    def verify(self, domains, cancel_token=None):
+        """
+        Look up several domains concurrently.
+
+        Args:
+            domains (list): List of domain names
+            cancel_token (CancelToken, optional): Lookups not yet sent when it is
+                cancelled are skipped and return None
+
+        Returns:
+            dict: Domain to RDAP_REGISTERED, RDAP_AVAILABLE or None
+        """
+        unique = list(dict.fromkeys(domain.lower() for domain in domains))
+        if not unique:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.pool_size, len(unique))) as pool:
+            return dict(zip(unique, pool.map(partial(self.lookup, cancel_token=cancel_token), unique)))
+
+    def verify_results(self, results, cancel_token=None):
+        """
+        Confirm the "Available" entries of a result list with RDAP.
+
+        Args:
+            results (list): List of [domain, status] pairs from check_domains
+            cancel_token (CancelToken, optional): Stops outstanding lookups; domains
+                that were not looked up keep their DNS status
+
+        Returns:
+            list: List of [domain, status] pairs where available domains that
+            RDAP reports as registered are marked REGISTERED_NO_DNS_STATUS
+        """
+        candidates = [domain for domain, status in results if status == "Available"]
+        answers = self.verify(candidates, cancel_token)
+        return [
+            [domain, REGISTERED_NO_DNS_STATUS]
+            if status == "Available" and answers.get(domain.lower()) == RDAP_REGISTERED
+            else [domain, status]
+            for domain, status in results
+        ]
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
@@ -0,0 +1,170 @@
+"""
+Compact, columnar representation of domain check results.
+
+Instead of a list of [domain, status] lists holding long status strings, a
+ResultSet keeps the domain names in one list and one byte per status in an
+array. The scheduler, the sharded checker and the history re-check fill
+ResultSets directly. Iterating a ResultSet still yields (domain, status)
+pairs, so code written for the list form keeps working, and it converts
+cheaply to the DataFrame and JSON forms used for display and saved searches.
+"""
+
+from array import array
+from enum import IntEnum
+
+import pandas as pd
+
+from domain_checker import UNCHECKED_STATUS, ERROR_STATUS
+from rdap_verifier import REGISTERED_NO_DNS_STATUS
+
+COMPACT_FORMAT = "compact-v1"
+
+
+class DomainStatus(IntEnum):
+    AVAILABLE = 0
+    REGISTERED_ACTIVE = 1
+    REGISTERED_INACTIVE = 2
+    REGISTERED_NO_DNS = 3
+    UNCHECKED = 4
+    ERROR = 5
+
+
+# Display labels, indexed by DomainStatus value
+STATUS_LABELS = (
+    "Available",
+    "Registered (Active Website)",
+    "Registered (No Active Website)",
+    REGISTERED_NO_DNS_STATUS,
+    UNCHECKED_STATUS,
+    ERROR_STATUS,
+)
+STATUS_CODES = {label: code for code, label in enumerate(STATUS_LABELS)}
+
+
+class ResultSet:
+    """Domain check results stored as parallel domain and status-code columns"""
+
+    __slots__ = ("domains", "codes")
+
+    def __init__(self, domains=None, codes=None):
+        self.domains = list(domains) if domains else []
+        self.codes = array("B", codes or [])
+        if len(self.domains) != len(self.codes):
+            raise ValueError("domains and codes must be the same length")
+
+    @classmethod
+    def unchecked(cls, domains):
+        """Build a ResultSet for domains that have not been checked yet"""
+        result_set = cls()
+        result_set.domains = list(domains)
+        result_set.codes = array("B", [DomainStatus.UNCHECKED]) * len(result_set.domains)
+        return result_set
+
+    @classmethod
+    def from_pairs(cls, results):
+        """
+        Build a ResultSet from [domain, status] pairs.
+
+        Args:
+            results (iterable): [domain, status] pairs as returned by check_domains
+
+        Returns:
+            ResultSet: Compact copy of the results
+        """
+        if isinstance(results, cls):
+            return results
+        result_set = cls()
+        for domain, status in results:
+            result_set.append(domain, status)
+        return result_set
+
+    def append(self, domain, status):
+        """Add one result; status may be a label or a DomainStatus"""
+        code = _status_code(status)
+        self.domains.append(domain)
+        self.codes.append(code)
+
+    def set_status(self, index, status):
+        """Replace the status of one result; status may be a label or a DomainStatus"""
+        self.codes[index] = _status_code(status)
+
+    def __len__(self):
+        return len(self.domains)
+
+    def __iter__(self):
+        for domain, code in zip(self.domains, self.codes):
+            yield domain, STATUS_LABELS[code]
+
+    def __getitem__(self, index):
+        return self.domains[index], STATUS_LABELS[self.codes[index]]
+
+    def to_pairs(self):
+        """Return the results as a list of [domain, status] lists"""
+        return [[domain, status] for domain, status in self]
+
+    def count(self, status):
+        """Count results with the given DomainStatus"""
+        return self.codes.count(status)
+
+    def to_dataframe(self):
+        """
+        Convert to a DataFrame with Domain and Status columns.
+
+        The Status column is categorical, so the status codes are reused
+        instead of being expanded into one string per row.
+        """
+        return pd.DataFrame({
+            "Domain": self.domains,
+            "Status": pd.Categorical.from_codes(self.codes, categories=STATUS_LABELS),
+        })
+
+    def to_json_dict(self):
+        """
+        Convert to a JSON-serializable dict.
+
+        Domains share the business type and TLD, so the common suffix is stored
+        once, and statuses are stored as a string of one digit per domain.
+        """
+        suffix = _common_suffix(self.domains)
+        return {
+            "format": COMPACT_FORMAT,
+            "suffix": suffix,
+            "domains": [domain[:len(domain) - len(suffix)] for domain in self.domains],
+            "statuses": "".join(str(code) for code in self.codes),
+        }
+
+    @classmethod
+    def from_json_dict(cls, data):
+        """
+        Load results saved by to_json_dict, or the older list of [domain, status] pairs.
+
+        Args:
+            data (dict or list): Saved results
+
+        Returns:
+            ResultSet: Loaded results
+        """
+        if isinstance(data, dict) and data.get("format") == COMPACT_FORMAT:
+            suffix = data["suffix"]
+            return cls([prefix + suffix for prefix in data["domains"]], [int(c) for c in data["statuses"]])
+        return cls.from_pairs(data)
+
+
+def _status_code(status):
+    code = status if isinstance(status, int) else STATUS_CODES.get(status)
+    if code is None:
+        raise ValueError(f"Unknown domain status: {status}")
+    return code
+
+
+def _common_suffix(domains):
+    if not domains:
+        return ""
+    shortest = min(domains, key=len)
+    length = 0
+    while length < len(shortest) and all(domain[-length - 1] == shortest[-length - 1] for domain in domains):
+        length += 1
+    # Keep at least one character of every domain in the prefix list
+    if length == len(shortest):
+        length -= 1
+    return shortest[len(shortest) - length:] if length else ""
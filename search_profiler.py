@@ -0,0 +1,178 @@
+"""
+Opt-in profiling for domain searches.
+
+A SearchProfiler records, for one search:
+
+- a cProfile of the Streamlit script thread (validation, RDAP, rendering),
+- a stack-sampling profile of the script thread and of the scheduler workers
+  while they check this search's domains, in folded-stack format for
+  flamegraph.pl or speedscope,
+- the per-domain timeline from the scheduler: time held back by the
+  search's request delay, wait for a free worker, and check time.
+
+The result is saved as a JSON artifact next to the saved search.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from datetime import datetime
+
+SAMPLE_INTERVAL = 0.005
+PSTATS_LIMIT = 40
+SLOWEST_DOMAINS = 10
+
+
+class SearchProfiler:
+    """Context manager that profiles one search when enabled"""
+
+    def __init__(self, enabled=True, sample_interval=SAMPLE_INTERVAL):
+        self.enabled = enabled
+        self.sample_interval = sample_interval
+        self.started_at = None
+        self.wall_time = None
+        self.samples = 0
+        self._stacks = {}
+        self._timeline = []
+        self._watched = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._profile = cProfile.Profile()
+        self._sampler = None
+        self._main_ident = None
+        self._started = None
+
+    def __enter__(self):
+        if not self.enabled:
+            return self
+        self.started_at = datetime.now()
+        self._started = time.monotonic()
+        self._main_ident = threading.get_ident()
+        self._sampler = threading.Thread(target=self._sample_loop, name="search-profiler", daemon=True)
+        self._sampler.start()
+        try:
+            self._profile.enable()
+        except ValueError:
+            # Another profiler is active on this interpreter; keep the sampler only
+            print("cProfile unavailable, recording sampled stacks only")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.enabled:
+            return False
+        self._profile.disable()
+        self._stop.set()
+        self._sampler.join()
+        self.wall_time = time.monotonic() - self._started
+        for _, job in self._watched:
+            self._record_job(job)
+        return False
+
+    def watch(self, scheduler, job):
+        """
+        Include a scheduler job in this profile.
+
+        Worker threads are sampled while they check the job's domains, and the
+        job's per-domain timings are added to the timeline when profiling stops.
+
+        Args:
+            scheduler (CheckScheduler): Scheduler the job was submitted to
+            job (CheckJob): Submitted job
+        """
+        if self.enabled:
+            with self._lock:
+                self._watched.append((scheduler, job))
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_interval):
+            with self._lock:
+                watched = list(self._watched)
+            idents = {self._main_ident: "script"}
+            for scheduler, job in watched:
+                for ident in scheduler.threads_for(job):
+                    idents[ident] = "worker"
+            frames = sys._current_frames()
+            for ident, role in idents.items():
+                frame = frames.get(ident)
+                if frame is not None:
+                    self._add_stack(role, frame)
+            self.samples += 1
+
+    def _add_stack(self, role, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+            frame = frame.f_back
+        stack.append(role)
+        key = ";".join(reversed(stack))
+        self._stacks[key] = self._stacks.get(key, 0) + 1
+
+    def _record_job(self, job):
+        for index, ready_at, started_at, finished_at, thread_name in job.task_timings:
+            result = job.results[index]
+            self._timeline.append({
+                "domain": job.domains[index],
+                "status": result[1] if result else None,
+                "queued": round(job.submitted_at - self._started, 4),
+                "started": round(started_at - self._started, 4),
+                "finished": round(finished_at - self._started, 4),
+                # Held back by the request delay, then waiting for a worker
+                "paced": round(ready_at - job.submitted_at, 4),
+                "wait": round(started_at - ready_at, 4),
+                # The checker call only; the delay is applied by the scheduler
+                "duration": round(finished_at - started_at, 4),
+                "thread": thread_name,
+            })
+        self._timeline.sort(key=lambda entry: entry["started"])
+
+    def folded_stacks(self):
+        """Return sampled stacks in folded format ("frame;frame;frame count" per line)"""
+        return "\n".join(f"{stack} {count}" for stack, count in sorted(self._stacks.items()))
+
+    def pstats_text(self, limit=PSTATS_LIMIT):
+        """Return the cProfile report of the script thread, sorted by cumulative time"""
+        stream = io.StringIO()
+        try:
+            pstats.Stats(self._profile, stream=stream).sort_stats("cumulative").print_stats(limit)
+        except TypeError:
+            # Nothing was recorded
+            return ""
+        return stream.getvalue()
+
+    def slowest_domains(self, limit=SLOWEST_DOMAINS):
+        """Return the timeline entries with the longest check time"""
+        return sorted(self._timeline, key=lambda entry: entry["duration"], reverse=True)[:limit]
+
+    def to_dict(self):
+        """Build the profile artifact as a JSON-serializable dict"""
+        return {
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "wall_time": round(self.wall_time, 4) if self.wall_time is not None else None,
+            "sample_interval": self.sample_interval,
+            "samples": self.samples,
+            "slowest_domains": self.slowest_domains(),
+            "timeline": self._timeline,
+            "cprofile": self.pstats_text(),
+            "folded_stacks": self.folded_stacks(),
+        }
+
+    def save(self, path):
+        """
+        Write the profile artifact to a JSON file.
+
+        Args:
+            path (str): Destination file path
+
+        Returns:
+            str: The path written
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+        return path
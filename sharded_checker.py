@@ -0,0 +1,376 @@
+"""
+Sharded execution mode for domain checking.
+
+A coordinator hashes the domain list into N shards. Each shard is checked by a
+separate worker process (local mode) or by any machine that can reach a shared
+spool directory (spool mode). Results are merged back in input order with
+duplicates removed, as a compact ResultSet.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from domain_checker import check_domains, configure_resolver_pool, CancelToken
+from results import ResultSet
+
+DEFAULT_THREADS_PER_WORKER = 8
+SPOOL_POLL_INTERVAL = 0.5
+
+# A claimed shard whose claim file has not been touched for this long is
+# assumed to belong to a dead worker and is put back into pending/. Live
+# workers touch their claim every CLAIM_HEARTBEAT_INTERVAL seconds.
+CLAIM_LEASE = 120
+CLAIM_HEARTBEAT_INTERVAL = 30
+
+DEFAULT_COLLECT_TIMEOUT = 30 * 60
+
+
+def shard_for(domain, num_shards):
+    """
+    Pick a stable shard number for a domain.
+
+    Args:
+        domain (str): Domain name
+        num_shards (int): Total number of shards
+
+    Returns:
+        int: Shard index in the range [0, num_shards)
+    """
+    digest = hashlib.sha1(domain.lower().encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % num_shards
+
+
+def shard_domains(domains, num_shards):
+    """
+    Split a domain list into hash-based shards, dropping duplicates.
+
+    Args:
+        domains (list): List of domain names to check
+        num_shards (int): Number of shards to produce
+
+    Returns:
+        list: One list of (index, domain) pairs per shard, where index is the
+        position of the first occurrence of the domain in the input
+    """
+    shards = [[] for _ in range(num_shards)]
+    seen = set()
+    for index, domain in enumerate(domains):
+        key = domain.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        shards[shard_for(key, num_shards)].append((index, domain))
+    return shards
+
+
+def check_shard(shard, delay=0.5, timeout=3, threads=DEFAULT_THREADS_PER_WORKER, deadline=None):
+    """
+    Check every domain in a shard, using a thread pool inside the worker.
+
+    Args:
+        shard (list): List of (index, domain) pairs
+        delay (float): Delay after each request in seconds (per thread)
+        timeout (int): Request timeout in seconds
+        threads (int): Number of concurrent checks within this worker
+        deadline (float, optional): Seconds after which remaining domains are
+            reported as unchecked
+
+    Returns:
+        tuple: (indexes, ResultSet) with the input index of each shard domain
+        and the shard's results in the same order
+    """
+    if not shard:
+        return [], ResultSet()
+
+    cancel_token = CancelToken(deadline) if deadline is not None else None
+    if cancel_token is not None:
+        configure_resolver_pool(threads)
+
+    def check_one(item):
+        return check_domains([item[1]], delay, timeout, cancel_token)[0][1]
+
+    indexes = [index for index, _ in shard]
+    results = ResultSet.unchecked(domain for _, domain in shard)
+    with ThreadPoolExecutor(max_workers=max(1, min(threads, len(shard)))) as pool:
+        for position, status in enumerate(pool.map(check_one, shard)):
+            results.set_status(position, status)
+    return indexes, results
+
+
+def merge_shard_results(shard_results):
+    """
+    Merge per-shard results back into input order.
+
+    Args:
+        shard_results (list): Iterable of (indexes, ResultSet) as returned by check_shard
+
+    Returns:
+        ResultSet: Results in input order, one per domain
+    """
+    merged = {}
+    for indexes, results in shard_results:
+        for index, domain, code in zip(indexes, results.domains, results.codes):
+            if index not in merged:
+                merged[index] = (domain, code)
+    order = sorted(merged)
+    return ResultSet([merged[index][0] for index in order], [merged[index][1] for index in order])
+
+
+def check_domains_sharded(domains, workers=None, delay=0.5, timeout=3,
+                          threads_per_worker=DEFAULT_THREADS_PER_WORKER, deadline=None):
+    """
+    Check domains across several worker processes on this machine.
+
+    Args:
+        domains (list): List of domain names to check
+        workers (int, optional): Number of worker processes (defaults to CPU count)
+        delay (float): Delay after each request in seconds (per thread)
+        timeout (int): Request timeout in seconds
+        threads_per_worker (int): Concurrent checks inside each worker
+        deadline (float, optional): Seconds after which remaining domains are
+            reported as unchecked
+
+    Returns:
+        ResultSet: Results in input order, deduplicated
+    """
+    if not domains:
+        return ResultSet()
+
+    workers = workers or os.cpu_count() or 1
+    shards = [shard for shard in shard_domains(domains, workers) if shard]
+
+    if len(shards) == 1:
+        return merge_shard_results([check_shard(shards[0], delay, timeout, threads_per_worker, deadline)])
+
+    with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+        futures = [
+            pool.submit(check_shard, shard, delay, timeout, threads_per_worker, deadline)
+            for shard in shards
+        ]
+        return merge_shard_results(future.result() for future in futures)
+
+
+def _spool_dirs(spool_dir):
+    dirs = {name: os.path.join(spool_dir, name) for name in ("pending", "claimed", "done", "failed")}
+    for path in dirs.values():
+        os.makedirs(path, exist_ok=True)
+    return dirs
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _requeue_stale_claims(dirs, lease):
+    cutoff = time.time() - lease
+    for name in os.listdir(dirs["claimed"]):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(dirs["claimed"], name)
+        try:
+            if os.path.getmtime(path) >= cutoff:
+                continue
+            os.rename(path, os.path.join(dirs["pending"], name))
+        except OSError:
+            continue  # Finished or requeued by another worker meanwhile
+        print(f"Requeued stale shard {name}")
+
+
+def _claim_next(dirs):
+    for name in sorted(os.listdir(dirs["pending"])):
+        if not name.endswith(".json"):
+            continue
+        candidate = os.path.join(dirs["claimed"], name)
+        try:
+            os.rename(os.path.join(dirs["pending"], name), candidate)
+            # rename keeps the enqueue mtime; the lease starts now
+            os.utime(candidate)
+        except OSError:
+            continue  # Another worker got there first
+        return candidate
+    return None
+
+
+def _heartbeat(path, stop):
+    while not stop.wait(CLAIM_HEARTBEAT_INTERVAL):
+        try:
+            os.utime(path)
+        except OSError:
+            return  # Requeued by another worker; the results will still be written
+
+
+def enqueue_sharded_job(domains, spool_dir, num_shards):
+    """
+    Write a sharded job to a spool directory for workers on any node.
+
+    Args:
+        domains (list): List of domain names to check
+        spool_dir (str): Shared directory used as the work queue
+        num_shards (int): Number of shards to split the job into
+
+    Returns:
+        str: Job id to pass to collect_sharded_job
+    """
+    dirs = _spool_dirs(spool_dir)
+    job_id = uuid.uuid4().hex
+    for shard_index, shard in enumerate(shard_domains(domains, num_shards)):
+        name = f"{job_id}_{shard_index}.json"
+        _write_atomic(os.path.join(dirs["pending"], name), {"job_id": job_id, "shard": shard})
+    return job_id
+
+
+def run_spool_worker(spool_dir, delay=0.5, timeout=3,
+                     threads=DEFAULT_THREADS_PER_WORKER, exit_when_idle=True, lease=CLAIM_LEASE):
+    """
+    Claim and process shards from a spool directory.
+
+    A shard is claimed by renaming it into the claimed directory, which is
+    atomic on a shared filesystem, so several workers can poll the same spool.
+    The claim is a lease kept alive while the shard is checked; claims left
+    behind by crashed workers are put back into pending once the lease
+    expires, and shard files that cannot be read are moved to failed.
+
+    Args:
+        spool_dir (str): Shared directory used as the work queue
+        delay (float): Delay after each request in seconds (per thread)
+        timeout (int): Request timeout in seconds
+        threads (int): Concurrent checks inside this worker
+        exit_when_idle (bool): Return once no pending shards are left
+        lease (float): Seconds after which another worker's claim is considered stale
+
+    Returns:
+        int: Number of shards processed
+    """
+    dirs = _spool_dirs(spool_dir)
+    processed = 0
+    while True:
+        _requeue_stale_claims(dirs, lease)
+        claimed_path = _claim_next(dirs)
+        if claimed_path is None:
+            if exit_when_idle:
+                return processed
+            time.sleep(SPOOL_POLL_INTERVAL)
+            continue
+
+        name = os.path.basename(claimed_path)
+        try:
+            with open(claimed_path, "r") as f:
+                job = json.load(f)
+            shard = job["shard"]
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Moving unreadable shard {name} to failed: {e}")
+            os.replace(claimed_path, os.path.join(dirs["failed"], name))
+            continue
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=_heartbeat, args=(claimed_path, stop), daemon=True)
+        heartbeat.start()
+        try:
+            indexes, results = check_shard(shard, delay, timeout, threads)
+        except BaseException:
+            # Hand the shard back so another worker can retry it
+            try:
+                os.rename(claimed_path, os.path.join(dirs["pending"], name))
+            except OSError:
+                pass
+            raise
+        finally:
+            stop.set()
+            heartbeat.join()
+        _write_atomic(os.path.join(dirs["done"], name), {
+            "job_id": job["job_id"],
+            "indexes": indexes,
+            "results": results.to_json_dict(),
+        })
+        try:
+            os.remove(claimed_path)
+        except FileNotFoundError:
+            pass  # Lease expired and the shard was requeued; its duplicate result is harmless
+        processed += 1
+
+
+def spool_job_status(spool_dir, job_id, num_shards):
+    """
+    Report where each shard of a spooled job currently is.
+
+    Args:
+        spool_dir (str): Shared directory used as the work queue
+        job_id (str): Job id returned by enqueue_sharded_job
+        num_shards (int): Number of shards the job was split into
+
+    Returns:
+        dict: Shard indexes per state ("pending", "claimed", "done", "failed",
+        and "missing" for shards found nowhere)
+    """
+    dirs = _spool_dirs(spool_dir)
+    status = {state: [] for state in ("pending", "claimed", "done", "failed", "missing")}
+    for index in range(num_shards):
+        name = f"{job_id}_{index}.json"
+        # Check done first: a finished shard may still have a stale claim file
+        for state in ("done", "failed", "claimed", "pending"):
+            if os.path.exists(os.path.join(dirs[state], name)):
+                status[state].append(index)
+                break
+        else:
+            status["missing"].append(index)
+    return status
+
+
+def collect_sharded_job(spool_dir, job_id, num_shards, wait_timeout=DEFAULT_COLLECT_TIMEOUT):
+    """
+    Wait for all shards of a spooled job and merge their results.
+
+    Args:
+        spool_dir (str): Shared directory used as the work queue
+        job_id (str): Job id returned by enqueue_sharded_job
+        num_shards (int): Number of shards the job was split into
+        wait_timeout (float, optional): Give up after this many seconds
+            (None waits forever)
+
+    Returns:
+        ResultSet: Results in input order, or None if a shard failed or the
+        job did not finish before wait_timeout; the unfinished shards are printed
+    """
+    dirs = _spool_dirs(spool_dir)
+    paths = [os.path.join(dirs["done"], f"{job_id}_{i}.json") for i in range(num_shards)]
+    started = time.monotonic()
+    while not all(os.path.exists(path) for path in paths):
+        status = spool_job_status(spool_dir, job_id, num_shards)
+        timed_out = wait_timeout is not None and time.monotonic() - started >= wait_timeout
+        if status["failed"] or timed_out:
+            unfinished = {state: shards for state, shards in status.items() if shards and state != "done"}
+            print(f"Sharded job {job_id} incomplete: {unfinished}")
+            return None
+        time.sleep(SPOOL_POLL_INTERVAL)
+
+    shard_results = []
+    for path in paths:
+        with open(path, "r") as f:
+            done = json.load(f)
+        shard_results.append((done["indexes"], ResultSet.from_json_dict(done["results"])))
+        os.remove(path)
+    return merge_shard_results(shard_results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a spool worker for sharded domain checks")
+    parser.add_argument("spool_dir", help="Shared spool directory")
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--timeout", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS_PER_WORKER)
+    parser.add_argument("--forever", action="store_true", help="Keep polling when the spool is empty")
+    parser.add_argument("--lease", type=float, default=CLAIM_LEASE,
+                        help="Seconds before another worker's unrefreshed claim is requeued")
+    args = parser.parse_args()
+    count = run_spool_worker(args.spool_dir, args.delay, args.timeout, args.threads,
+                             exit_when_idle=not args.forever, lease=args.lease)
+    print(f"Processed {count} shards")